@@ -2,13 +2,18 @@ from google.adk.agents import Agent
 
 from .arch import arch_agent
 from .bob import bob_agent
+from .checkpoint import get_pipeline_status
+from .component_cache import get_component_cache_stats
 from .mike import mike_agent
+from .model_pool import get_model_pool_stats, interactive_model
 from .pack import pack_agent
+from .scheduler import get_scheduler_stats
 from .ui_designer import ui_designer_agent
+from .workspace import get_workspace_usage
 
 root_agent = Agent(
     name="website_builder_manager",
-    model="gemini-2.0-flash",
+    model=interactive_model,
     description=(
         "Manager agent for building websites, coordinating with specialized agents."
     ),
@@ -16,6 +21,14 @@ root_agent = Agent(
 
 Your job is to manage the entire workflow from start to finish. Once you start, execute ALL steps automatically without stopping for user confirmation between agents.
 
+**Resuming:**
+- Before starting, ALWAYS call get_pipeline_status. It only reports progress made earlier in this same conversation
+- If "resuming" is false, this is a new request: start with arch, even if files from earlier sites exist
+- Otherwise skip every stage listed in completed_stages and start at resume_stage
+- Stages map to agents: requirements → arch, design → mike, ui_plan → ui_designer, project/build → bob, zip → pack
+- When resuming at bob, pass the project path from completed_stages so bob reuses the existing project
+- If resume_stage is "done", tell the user where the finished zip file is
+
 **Workflow:**
 
 STEP 1 - ARCH (Requirements):
@@ -50,5 +63,12 @@ STEP 5 - PACK (Package):
 - The workflow should flow: arch → mike → ui_designer → bob → pack
 - Only the final result needs to be shown to the user
 - Each agent will interact with the user for their specific questions, but transitions between agents should be automatic""",
+    tools=[
+        get_pipeline_status,
+        get_workspace_usage,
+        get_scheduler_stats,
+        get_component_cache_stats,
+        get_model_pool_stats,
+    ],
     sub_agents=[arch_agent, mike_agent, ui_designer_agent, bob_agent, pack_agent],
 )
@@ -1,6 +1,10 @@
 import json
 
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
+
+from .checkpoint import record_checkpoint, session_id
+from .model_pool import interactive_model
 
 
 def ask_purpose() -> dict:
@@ -18,11 +22,17 @@ def ask_features() -> dict:
     return {"question": "What key features should your website have?"}
 
 
-def save_requirements_data(data: dict) -> dict:
+def save_requirements_data(data: dict, tool_context: ToolContext = None) -> dict:
     """Save the gathered requirements data to a JSON file for other agents to access."""
     try:
         with open("requirements_data.json", "w") as f:
             json.dump(data, f)
+        record_checkpoint(
+            "requirements",
+            {},
+            {"requirements": "requirements_data.json"},
+            session_id(tool_context),
+        )
         return {"status": "success", "message": "Requirements data saved to requirements_data.json"}
     except Exception as e:
         return {"status": "error", "error": str(e)}
@@ -30,7 +40,7 @@ def save_requirements_data(data: dict) -> dict:
 
 arch_agent = Agent(
     name="arch",
-    model="gemini-2.0-flash",
+    model=interactive_model,
     description=(
         "Agent that gathers detailed requirements for the website by asking questions one by one."
     ),
@@ -0,0 +1,485 @@
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import string
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; images are left untouched without it
+    Image = None
+
+try:
+    import brotli  # noqa: F401  (needed by fontTools to write woff2)
+    from fontTools import subset as font_subset
+except ImportError:  # fontTools is optional; fonts are self-hosted without subsetting
+    font_subset = None
+
+CACHE_DIR = os.getenv("RAVE_CACHE_DIR", ".rave_cache")
+# Size cap for the image and font caches, evicted least recently used first.
+CACHE_MAX_BYTES = int(float(os.getenv("RAVE_ASSET_CACHE_MB", "512")) * 1024 * 1024)
+# Entries used this recently are never evicted, so a concurrent build keeps its files.
+CACHE_GRACE_SECONDS = 600
+# Image encoding workers; the build slot's memory reservation has to cover them.
+MAX_WORKERS = max(1, int(os.getenv("RAVE_ASSET_WORKERS", "2")))
+# Widths generated for srcset; never wider than the source image.
+IMAGE_WIDTHS = (480, 960, 1440, 1920)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+IMAGE_QUALITY = {"avif": 50, "webp": 75}
+# Served from dist/, next to the assets Astro copies from public/.
+OUTPUT_PREFIX = "_rave"
+
+GENERIC_FAMILIES = ("sans-serif", "serif", "monospace", "system-ui", "cursive")
+# Design roles whose fonts render above the fold and are worth preloading.
+PRELOAD_ROLES = re.compile(r"body|heading|headline|primary|text", re.IGNORECASE)
+
+# Google Fonts only serves woff2 to browsers that advertise support for it.
+FONT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+FONT_LINK_PATTERN = re.compile(
+    r"<link\b[^>]*href=\"(https://fonts\.(?:googleapis|gstatic)\.com[^\"]*)\"[^>]*>\s*",
+    re.IGNORECASE,
+)
+FONT_IMPORT_PATTERN = re.compile(
+    r"@import\s+url\(['\"]?(https://fonts\.googleapis\.com/[^'\")]+)['\"]?\)\s*;?\s*"
+)
+FONT_FACE_PATTERN = re.compile(r"/\*\s*([\w-]+)\s*\*/\s*@font-face\s*\{([^}]*)\}")
+# An <img> already wrapped in <picture> by an earlier pass is matched with its
+# sources so it is left alone.
+IMG_PATTERN = re.compile(r"(<picture>(?:<source\b[^>]*>)*)?<img\b[^>]*>", re.IGNORECASE)
+ATTR_PATTERN = re.compile(r"([\w:-]+)\s*=\s*(\"[^\"]*\"|'[^']*')")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _walk(root: str, extensions: tuple) -> list:
+    found = []
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d != OUTPUT_PREFIX]
+        found.extend(
+            os.path.join(dirpath, name) for name in files if name.lower().endswith(extensions)
+        )
+    return sorted(found)
+
+
+def _process_image(source: str, target_dir: str) -> dict:
+    """Write resized AVIF/WebP variants of one image; runs in a worker process."""
+    os.makedirs(target_dir, exist_ok=True)
+    with Image.open(source) as image:
+        image.load()
+        width, height = image.size
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        widths = sorted({w for w in IMAGE_WIDTHS if w < width} | {width})
+        variants = {}
+        for fmt in ("avif", "webp"):
+            files = []
+            try:
+                for w in widths:
+                    resized = image if w == width else image.resize(
+                        (w, round(height * w / width)), Image.LANCZOS
+                    )
+                    name = f"{w}.{fmt}"
+                    resized.save(os.path.join(target_dir, name), fmt.upper(), quality=IMAGE_QUALITY[fmt])
+                    files.append([w, name])
+            except (KeyError, OSError, ValueError):
+                # This Pillow build cannot encode the format (usually AVIF).
+                continue
+            variants[fmt] = files
+
+    manifest = {"width": width, "height": height, "variants": variants}
+    with open(os.path.join(target_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def _load_manifest(target_dir: str):
+    try:
+        with open(os.path.join(target_dir, "manifest.json"), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def process_images(public_dir: str, dist_dir: str, cache_dir: str = CACHE_DIR) -> dict:
+    """Generate responsive variants for every image under public/, cached by content hash.
+
+    Returns a mapping from the image's URL path to its srcset data. Images
+    whose content was processed before are served from the cache without
+    touching the process pool.
+    """
+    images = {}
+    pending = {}
+    for path in _walk(public_dir, IMAGE_EXTENSIONS):
+        url = "/" + os.path.relpath(path, public_dir).replace(os.sep, "/")
+        digest = _sha256(_read_bytes(path))
+        target_dir = os.path.abspath(os.path.join(cache_dir, "images", digest))
+        manifest = _load_manifest(target_dir)
+        if manifest is not None:
+            # The directory's mtime is the LRU clock for cache eviction.
+            os.utime(target_dir, None)
+        images[url] = {"digest": digest, "cache_dir": target_dir, "manifest": manifest}
+        if manifest is None:
+            pending[url] = (path, target_dir)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(MAX_WORKERS, len(pending))) as pool:
+            futures = {
+                url: pool.submit(_process_image, path, target_dir)
+                for url, (path, target_dir) in pending.items()
+            }
+            for url, future in futures.items():
+                try:
+                    images[url]["manifest"] = future.result()
+                except Exception as e:
+                    images[url]["error"] = str(e)
+
+    out_dir = os.path.join(dist_dir, OUTPUT_PREFIX, "img")
+    os.makedirs(out_dir, exist_ok=True)
+    for url, entry in images.items():
+        manifest = entry["manifest"]
+        if not manifest:
+            continue
+        entry["srcset"] = {}
+        for fmt, files in manifest["variants"].items():
+            parts = []
+            for w, name in files:
+                published = f"{entry['digest'][:16]}-{name}"
+                shutil.copyfile(
+                    os.path.join(entry["cache_dir"], name), os.path.join(out_dir, published)
+                )
+                parts.append(f"/{OUTPUT_PREFIX}/img/{published} {w}w")
+            entry["srcset"][fmt] = ", ".join(parts)
+    return {"images": images, "processed": len(pending), "cached": len(images) - len(pending)}
+
+
+def _rewrite_img(match, images: dict, first: bool) -> str:
+    tag = match.group(0)
+    if match.group(1):
+        return tag
+    attrs = {k.lower(): v[1:-1] for k, v in ATTR_PATTERN.findall(tag)}
+    entry = images.get(urllib.parse.unquote(attrs.get("src", "").split("?")[0]))
+    if not entry or not entry.get("srcset") or "srcset" in attrs:
+        return tag
+
+    manifest = entry["manifest"]
+    extra = []
+    if "width" not in attrs and "height" not in attrs:
+        extra.append(f'width="{manifest["width"]}" height="{manifest["height"]}"')
+    if "loading" not in attrs and not first:
+        # The first image is usually the LCP element and must not be deferred.
+        extra.append('loading="lazy"')
+    if "decoding" not in attrs:
+        extra.append('decoding="async"')
+    sizes = attrs.get("sizes", "100vw")
+    img = tag[:-2].rstrip() if tag.endswith("/>") else tag[:-1].rstrip()
+    img = " ".join([img] + extra) + ">"
+
+    sources = "".join(
+        f'<source type="image/{fmt}" srcset="{entry["srcset"][fmt]}" sizes="{sizes}">'
+        for fmt in ("avif", "webp")
+        if fmt in entry["srcset"]
+    )
+    return f"<picture>{sources}{img}</picture>"
+
+
+def _design_fonts(design: dict) -> dict:
+    """Pull font family names out of mike's design data, keyed by lowercase name.
+
+    Each family maps to whether it has a body or heading role, e.g.
+    {"fonts": {"body": "Inter (400, 700)"}} -> {"inter": {"name": "Inter", "preload": True}}.
+    """
+    families = {}
+
+    def visit(path, value, in_fonts=False):
+        key = path[-1] if path else ""
+        in_fonts = in_fonts or bool(re.search(r"font|typograph", key, re.IGNORECASE))
+        if isinstance(value, dict):
+            for k, v in value.items():
+                visit(path + [str(k)], v, in_fonts)
+        elif isinstance(value, list):
+            for v in value:
+                visit(path, v, in_fonts)
+        elif isinstance(value, str) and in_fonts:
+            role = bool(PRELOAD_ROLES.search(".".join(path)))
+            value = re.sub(r"\([^)]*\)", "", value)
+            for part in re.split(r",|;|/|\band\b", value):
+                # "Inter font for body text (400, 700)" -> "Inter"
+                name = re.split(r"\bfor\b|\bfonts?\b|\(|:", part, flags=re.IGNORECASE)[0]
+                name = name.strip(" '\"")
+                if name[:1].isalpha() and len(name) < 40 and name.lower() not in GENERIC_FAMILIES:
+                    entry = families.setdefault(name.lower(), {"name": name, "preload": False})
+                    entry["preload"] = entry["preload"] or role
+
+    visit([], design)
+    return families
+
+
+def _linked_families(css_url: str) -> list:
+    """Return the lowercase family names requested by a Google Fonts stylesheet URL."""
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(css_url).query)
+    names = []
+    for value in query.get("family", []):
+        # css2: "Inter:wght@400;700"; css: "Inter:400,700|Roboto"
+        names += [part.split(":")[0].strip().lower() for part in value.split("|")]
+    return [n for n in names if n]
+
+
+def _fetch(url: str) -> bytes:
+    request = urllib.request.Request(url, headers={"User-Agent": FONT_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=20) as response:
+        return response.read()
+
+
+def _font_faces(css_url: str) -> list:
+    """Return the latin @font-face rules from a Google Fonts stylesheet."""
+    css = _fetch(css_url).decode("utf-8")
+    faces = []
+    for subset, body in FONT_FACE_PATTERN.findall(css):
+        if subset != "latin":
+            continue
+        rules = dict(
+            (k.strip(), v.strip()) for k, v in
+            (line.split(":", 1) for line in body.split(";") if ":" in line)
+        )
+        src = re.search(r"url\(([^)]+)\)", rules.get("src", ""))
+        if src:
+            faces.append({"rules": rules, "url": src.group(1).strip("'\"")})
+    return faces
+
+
+def _self_host_font(url: str, text: str, out_dir: str, cache_dir: str) -> str:
+    """Download and subset one woff2 file; returns the published file name."""
+    key = _sha256((url + "\0" + text).encode("utf-8"))[:16]
+    name = f"{key}.woff2"
+    cached = os.path.join(cache_dir, "fonts", name)
+    if not os.path.exists(cached):
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        raw = cached + ".orig"
+        with open(raw, "wb") as f:
+            f.write(_fetch(url))
+        if font_subset is not None:
+            options = font_subset.Options()
+            options.flavor = "woff2"
+            font = font_subset.load_font(raw, options)
+            subsetter = font_subset.Subsetter(options)
+            subsetter.populate(text=text)
+            subsetter.subset(font)
+            font_subset.save_font(font, cached, options)
+            os.remove(raw)
+        else:
+            os.replace(raw, cached)
+    else:
+        os.utime(cached, None)
+    shutil.copyfile(cached, os.path.join(out_dir, name))
+    return name
+
+
+def _is_font_css(url: str) -> bool:
+    return "fonts.googleapis.com/css" in url
+
+
+def self_host_fonts(
+    dist_dir: str, html_files: list, design: dict = None, cache_dir: str = CACHE_DIR
+) -> dict:
+    """Download, subset and self-host the Google Fonts stylesheets the site links to.
+
+    Only fonts the pages or stylesheets already load are touched. A
+    stylesheet is listed in "replaced" only if all of its faces were
+    self-hosted; the rest keep loading from Google. The design's body and
+    heading fonts are the ones preloaded; design fonts the site never links
+    are reported in "missing" rather than added, since no CSS uses them.
+    """
+    design_fonts = _design_fonts(design or {})
+    wanted = {key for key, entry in design_fonts.items() if entry["preload"]} or set(design_fonts)
+    css_urls = []
+    for path in html_files + _walk(dist_dir, (".css",)):
+        source = _read_bytes(path).decode("utf-8")
+        css_urls += [html.unescape(u) for u in FONT_LINK_PATTERN.findall(source)]
+        css_urls += FONT_IMPORT_PATTERN.findall(source)
+    css_urls = [u for u in dict.fromkeys(css_urls) if _is_font_css(u)]
+    linked = {name for u in css_urls for name in _linked_families(u)}
+
+    # Subset every font to the characters the site actually renders.
+    text = set(string.printable)
+    for path in html_files:
+        body = re.sub(r"<[^>]+>", " ", _read_bytes(path).decode("utf-8"))
+        text.update(html.unescape(body))
+    text = "".join(sorted(text))
+
+    out_dir = os.path.join(dist_dir, OUTPUT_PREFIX, "fonts")
+    os.makedirs(out_dir, exist_ok=True)
+    faces, preloads, errors, replaced = [], [], [], []
+    for css_url in css_urls:
+        url_faces, url_preloads = [], []
+        try:
+            for face in _font_faces(css_url):
+                name = _self_host_font(face["url"], text, out_dir, cache_dir)
+                rules = dict(face["rules"])
+                rules["src"] = f"url(/{OUTPUT_PREFIX}/fonts/{name}) format('woff2')"
+                rules.setdefault("font-display", "swap")
+                rules.pop("unicode-range", None)
+                url_faces.append("@font-face{" + ";".join(f"{k}:{v}" for k, v in rules.items()) + "}")
+                family = rules.get("font-family", "").strip("'\"").lower()
+                regular = rules.get("font-weight") == "400" \
+                    and rules.get("font-style", "normal") == "normal"
+                # Without usable design fonts, every regular face is preloaded.
+                if regular and (family in wanted or not wanted & linked):
+                    url_preloads.append(f"/{OUTPUT_PREFIX}/fonts/{name}")
+        except Exception as e:
+            errors.append({"font_css": css_url, "error": str(e)})
+            continue
+        if url_faces:
+            faces += url_faces
+            preloads += url_preloads
+            replaced.append(css_url)
+    return {
+        "font_faces": faces,
+        "preloads": preloads,
+        "errors": errors,
+        "css_urls": css_urls,
+        "replaced": replaced,
+        "missing": [e["name"] for key, e in design_fonts.items() if key not in linked],
+    }
+
+
+def _cache_entries(cache_dir: str) -> list:
+    """List (last_used, size, path) for every image and font in the asset cache."""
+    entries = []
+    for kind in ("images", "fonts"):
+        kind_dir = os.path.join(cache_dir, kind)
+        if not os.path.isdir(kind_dir):
+            continue
+        for name in os.listdir(kind_dir):
+            path = os.path.join(kind_dir, name)
+            try:
+                size = os.path.getsize(path)
+                if os.path.isdir(path):
+                    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                entries.append((os.stat(path).st_mtime, size, path))
+            except OSError:
+                # Removed by a concurrent eviction.
+                continue
+    return sorted(entries)
+
+
+def evict_cache(cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES) -> dict:
+    """Drop the least recently used cached images and fonts until the cache fits its cap."""
+    entries = _cache_entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+    now = time.time()
+    evicted = 0
+    for last_used, size, path in entries:
+        if total <= max_bytes:
+            break
+        if now - last_used < CACHE_GRACE_SECONDS:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+        total -= size
+        evicted += 1
+    return {"cache_bytes": total, "evicted": evicted}
+
+
+def optimize_assets(project_dir: str) -> dict:
+    """Add responsive images and self-hosted fonts to a built Astro site in dist/."""
+    try:
+        dist_dir = os.path.join(project_dir, "dist")
+        public_dir = os.path.join(project_dir, "public")
+        if not os.path.isdir(dist_dir):
+            return {
+                "status": "error",
+                "error": "Build directory does not exist. Build the project first.",
+            }
+        html_files = _walk(dist_dir, (".html",))
+        report = {"status": "success"}
+
+        images = {}
+        if Image is None:
+            report["images"] = "skipped: install Pillow to generate responsive images"
+        elif os.path.isdir(public_dir):
+            result = process_images(public_dir, dist_dir)
+            images = result["images"]
+            report["images"] = {
+                "processed": result["processed"],
+                "cached": result["cached"],
+                "errors": {u: e["error"] for u, e in images.items() if "error" in e},
+            }
+
+        try:
+            with open("design_data.json", "r") as f:
+                design = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            design = {}
+        fonts = self_host_fonts(dist_dir, html_files, design)
+        report["fonts"] = {
+            "self_hosted_faces": len(fonts["font_faces"]),
+            "preloaded": fonts["preloads"],
+            "design_fonts_not_linked": fonts["missing"],
+            "errors": fonts["errors"],
+            "kept_external": [u for u in fonts["css_urls"] if u not in fonts["replaced"]],
+            "subset": font_subset is not None,
+        }
+        replaced = set(fonts["replaced"])
+        # Preconnect hints are only dropped once no stylesheet loads from Google.
+        all_replaced = replaced == set(fonts["css_urls"])
+
+        def drop_link(match):
+            url = html.unescape(match.group(1))
+            if url in replaced or (all_replaced and not _is_font_css(url)):
+                return ""
+            return match.group(0)
+
+        head = ""
+        if replaced:
+            head = "".join(
+                f'<link rel="preload" href="{url}" as="font" type="font/woff2" crossorigin>'
+                for url in fonts["preloads"]
+            ) + "<style>" + "".join(fonts["font_faces"]) + "</style>"
+
+        rewritten_pages = 0
+        for path in html_files:
+            source = _read_bytes(path).decode("utf-8")
+            seen = []
+            updated = IMG_PATTERN.sub(
+                lambda m: seen.append(m) or _rewrite_img(m, images, len(seen) == 1), source
+            )
+            updated = FONT_LINK_PATTERN.sub(drop_link, updated)
+            if head and "</head>" in updated and head not in updated:
+                updated = updated.replace("</head>", head + "</head>", 1)
+            if updated != source:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(updated)
+                rewritten_pages += 1
+        if replaced:
+            for path in _walk(dist_dir, (".css",)):
+                source = _read_bytes(path).decode("utf-8")
+                updated = FONT_IMPORT_PATTERN.sub(
+                    lambda m: "" if m.group(1) in replaced else m.group(0), source
+                )
+                if updated != source:
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(updated)
+
+        report["rewritten_pages"] = rewritten_pages
+        report["cache"] = evict_cache()
+        return report
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
@@ -1,30 +1,96 @@
 import json
 import os
+import shutil
 import subprocess
 
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
+
+from .assets import optimize_assets
+from .checkpoint import claim_checkpoint, find_checkpoint, record_checkpoint, session_id
+from .codegen import generate_site_code
+from .content import ingest_content, validate_content
+from .hydration import plan_hydration
+from .model_pool import batch_model
+from .scheduler import heavy_slot, run_heavy
+from .workspace import is_registered, pin, register, start_sweeper
+
+# Planning outputs that the generated project tree is derived from.
+PLAN_FILES = {
+    "requirements": "requirements_data.json",
+    "design": "design_data.json",
+    "ui_plan": "ui_plan.json",
+}
+# Everything under src/ that is generated from the plan. It is cleared when an
+# existing project is reused for a new plan, so no page of the old site ships.
+GENERATED_SOURCES = ("pages", "components", "layouts", "content", "styles", "content.config.ts")
+
+
+def _checkpoint_output(stage: str, inputs: dict, name: str):
+    """Return the recorded output path of a stage if its inputs are unchanged."""
+    entry = find_checkpoint(stage, inputs)
+    if entry is None:
+        return None
+    return entry["outputs"][name]["path"]
 
 
 def init_astro_project(project_name: str) -> dict:
     """Initialize a new Astro project with React support."""
     try:
+        # Evict old projects, build folders and zips in the background
+        start_sweeper()
+        project_dir = os.path.join(os.getcwd(), project_name)
+        if _checkpoint_output("project", PLAN_FILES, "project") == project_dir:
+            pin(project_dir)
+            return {
+                "status": "success",
+                "resumed": True,
+                "project_dir": project_dir,
+                "message": "Project tree is up to date with the current plan; reusing it",
+            }
+
+        if os.path.exists(project_dir) and not is_registered(project_dir):
+            return {
+                "status": "error",
+                "error": f"{project_name} exists but was not created here; choose another name.",
+            }
+        if os.path.exists(os.path.join(project_dir, "package.json")):
+            # The plan changed since this project was scaffolded: keep the
+            # scaffolding and node_modules, and drop every generated source.
+            pin(project_dir)
+            removed = []
+            for name in GENERATED_SOURCES:
+                path = os.path.join(project_dir, "src", name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                elif os.path.exists(path):
+                    os.remove(path)
+                else:
+                    continue
+                removed.append(os.path.join("src", name))
+            return {
+                "status": "success",
+                "reused_dir": True,
+                "project_dir": project_dir,
+                "removed": removed,
+                "message": "Project directory already exists; old sources removed, regenerate them",
+            }
+
         # Ensure npm is available
         command = f"npm create astro@latest {project_name} -- --template minimal --yes"
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            cwd=".",
-        )
+        result, scheduler = run_heavy("install", command, cwd=".", shell=True)
         if result.returncode == 0:
+            # Keep the sweeper away from this project until pack has zipped it
+            pin(project_dir)
+            register(project_dir)
             return {
                 "status": "success",
                 "output": result.stdout,
-                "project_dir": os.path.join(os.getcwd(), project_name),
+                "project_dir": project_dir,
+                "scheduler": scheduler,
             }
         else:
-            return {"status": "error", "error": result.stderr}
+            return {"status": "error", "error": result.stderr, "scheduler": scheduler}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
@@ -36,21 +102,19 @@ def add_react_integration(project_dir: str) -> dict:
             return {"status": "error", "error": "Project directory does not exist."}
         
         # Add Astro React integration
-        result = subprocess.run(
-            ["npx", "astro", "add", "react", "--yes"],
-            capture_output=True,
-            text=True,
-            cwd=project_dir
+        result, scheduler = run_heavy(
+            "install", ["npx", "astro", "add", "react", "--yes"], cwd=project_dir
         )
         
         if result.returncode == 0:
             return {
                 "status": "success",
                 "output": result.stdout,
-                "message": "React integration added successfully"
+                "message": "React integration added successfully",
+                "scheduler": scheduler,
             }
         else:
-            return {"status": "error", "error": result.stderr}
+            return {"status": "error", "error": result.stderr, "scheduler": scheduler}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
@@ -62,21 +126,19 @@ def add_tailwind_integration(project_dir: str) -> dict:
             return {"status": "error", "error": "Project directory does not exist."}
         
         # Add Astro Tailwind integration
-        result = subprocess.run(
-            ["npx", "astro", "add", "tailwind", "--yes"],
-            capture_output=True,
-            text=True,
-            cwd=project_dir
+        result, scheduler = run_heavy(
+            "install", ["npx", "astro", "add", "tailwind", "--yes"], cwd=project_dir
         )
         
         if result.returncode == 0:
             return {
                 "status": "success",
                 "output": result.stdout,
-                "message": "Tailwind CSS integration added successfully"
+                "message": "Tailwind CSS integration added successfully",
+                "scheduler": scheduler,
             }
         else:
-            return {"status": "error", "error": result.stderr}
+            return {"status": "error", "error": result.stderr, "scheduler": scheduler}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
@@ -192,47 +254,82 @@ def write_layout_file(project_dir: str, layout_name: str, content: str) -> dict:
         return {"status": "error", "error": str(e)}
 
 
-def install_dependencies(project_dir: str) -> dict:
+def install_dependencies(project_dir: str, tool_context: ToolContext = None) -> dict:
     """Install npm dependencies for the Astro project."""
     try:
         if not os.path.exists(project_dir):
             return {"status": "error", "error": "Project directory does not exist."}
-        
-        result = subprocess.run(
-            ["npm", "install"],
-            capture_output=True,
-            text=True,
-            cwd=project_dir
-        )
+
+        project_dir = os.path.abspath(project_dir)
+        # Refresh the pin so a long session keeps its project
+        pin(project_dir)
+        if os.path.isdir(os.path.join(project_dir, "node_modules")) and (
+            _checkpoint_output("project", PLAN_FILES, "project") == project_dir
+        ):
+            claim_checkpoint("project", session_id(tool_context))
+            return {
+                "status": "success",
+                "cached": True,
+                "message": "Dependencies already installed for this project tree",
+            }
+
+        result, scheduler = run_heavy("install", ["npm", "install"], cwd=project_dir)
         
         if result.returncode == 0:
+            record_checkpoint(
+                "project", PLAN_FILES, {"project": project_dir}, session_id(tool_context)
+            )
             return {
                 "status": "success",
                 "output": result.stdout,
-                "message": "Dependencies installed successfully"
+                "message": "Dependencies installed successfully",
+                "scheduler": scheduler,
             }
         else:
-            return {"status": "error", "error": result.stderr}
+            return {"status": "error", "error": result.stderr, "scheduler": scheduler}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
-def build_astro_project(project_dir: str) -> dict:
+def build_astro_project(project_dir: str, tool_context: ToolContext = None) -> dict:
     """Build the Astro project."""
     try:
         if not os.path.exists(project_dir):
             return {"status": "error", "error": "Project directory does not exist."}
-        result = subprocess.run(
-            ["npm", "run", "build"], capture_output=True, text=True, cwd=project_dir
-        )
+
+        project_dir = os.path.abspath(project_dir)
+        # Refresh the pin so a long session keeps its project
+        pin(project_dir)
+        build_dir = os.path.join(project_dir, "dist")
+        if _checkpoint_output("build", {"project": project_dir}, "dist") == build_dir:
+            claim_checkpoint("build", session_id(tool_context))
+            return {
+                "status": "success",
+                "cached": True,
+                "build_dir": build_dir,
+                "message": "Sources unchanged since the last build; reusing dist/",
+            }
+
+        with heavy_slot("build") as scheduler:
+            result = subprocess.run(
+                ["npm", "run", "build"], cwd=project_dir, capture_output=True, text=True
+            )
+            # Responsive images and self-hosted fonts are part of the build
+            # output, and their worker pool counts against the same slot.
+            assets = optimize_assets(project_dir) if result.returncode == 0 else None
         if result.returncode == 0:
+            record_checkpoint(
+                "build", {"project": project_dir}, {"dist": build_dir}, session_id(tool_context)
+            )
             return {
                 "status": "success",
                 "output": result.stdout,
-                "build_dir": os.path.join(project_dir, "dist"),
+                "build_dir": build_dir,
+                "assets": assets,
+                "scheduler": scheduler,
             }
         else:
-            return {"status": "error", "error": result.stderr}
+            return {"status": "error", "error": result.stderr, "scheduler": scheduler}
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
@@ -281,7 +378,7 @@ def get_ui_plan() -> dict:
 
 bob_agent = Agent(
     name="bob",
-    model="gemini-2.0-flash",
+    model=batch_model,
     description="Agent responsible for building the website using Astro with React integration by writing actual code files.",
     instruction="""You are the builder agent Bob. When called, introduce yourself first.
 
@@ -294,15 +391,17 @@ Follow these steps AUTOMATICALLY without waiting for user confirmation:
 4. Initialize an Astro project using init_astro_project with a meaningful project name
 5. Add React integration using add_react_integration
 6. Add Tailwind CSS integration using add_tailwind_integration
-7. WRITE ACTUAL CODE FILES:
-   - Create a Layout file with proper HTML structure, meta tags, and design styling
-   - Create React components (.jsx) for interactive UI elements using write_react_component
-   - Create Astro components (.astro) for static sections using write_astro_component
-   - Create Page files (.astro) that import and use the components
+7. WRITE ACTUAL CODE FILES with generate_site_code:
+   - It splits the UI plan into independent units and writes them concurrently
+   - The Layout and every component are generated in parallel, then all pages in parallel
+   - Do NOT write the planned components one by one yourself
+8. Review the result of generate_site_code:
+   - For each entry in "failed", write that file yourself with write_layout_file, write_react_component, write_astro_component or write_astro_page; its "unit", "kind" and "ext" name the file to write
    - Create CSS files if needed (Tailwind will handle most styling)
-8. Implement the UI plan provided by ui_designer with the suggested components
-9. Install dependencies using install_dependencies
-10. Build the project using build_astro_project
+   - For blogs, catalogs and other repeated entries, do NOT write one page per entry. If the requirements point to structured content (a JSON, CSV or Markdown file or folder), use ingest_content to load it into a content collection; it writes the entries, the schema, a [slug].astro route and a paginated listing. Fix anything validate_content reports
+9. Run plan_hydration on the project: it renders purely presentational React components as static HTML and gives interactive ones the lightest client directive
+10. Install dependencies using install_dependencies
+11. Build the project using build_astro_project
 
 IMPORTANT: You must write the FULL code content for each file, not templates or placeholders.
 
@@ -314,7 +413,7 @@ React Components (.jsx):
 - Example: Button, Navbar, Card components
 
 Astro Pages (.astro):
-- Import React components with client:load or client:visible directives
+- Import React components; plan_hydration decides their client:* directives
 - Use layouts for consistent structure
 - Include proper meta tags and SEO
 - Example: <Button client:load>Click me</Button>
@@ -322,12 +421,20 @@ Astro Pages (.astro):
 Styling:
 - Use Tailwind CSS utility classes
 - Match colors, fonts from design data
+- Put images in public/ and reference them with plain <img src="/..."> tags; the build adds srcset, WebP/AVIF variants and width/height
+- Load the design's fonts with Google Fonts <link> tags in the layout; the build replaces them with subsetted, self-hosted fonts
 - Implement responsive design (mobile-first)
 - Add hover effects and transitions
 
+Resuming: if the manager tells you the project stage is already complete, pass the existing project name to init_astro_project. When it reports "resumed", skip steps 5-9 and go straight to install_dependencies and build_astro_project; both reuse earlier results when nothing changed. When it reports "reused_dir", the plan changed since the project was created and the old pages, components, layouts, styles and content were deleted: skip steps 5-6 and continue with step 7 to write every file of the new plan.
+
 After building successfully, IMMEDIATELY tell the manager that the build is complete and ready for packaging. DO NOT wait for user confirmation to proceed.""",
     tools=[
         init_astro_project,
+        generate_site_code,
+        plan_hydration,
+        ingest_content,
+        validate_content,
         add_react_integration,
         add_tailwind_integration,
         write_astro_page,
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+from google.adk.tools import ToolContext
+
+CHECKPOINT_FILE = "pipeline_checkpoints.json"
+
+# Pipeline stages in the order the manager runs them.
+STAGES = ["requirements", "design", "ui_plan", "project", "build", "zip"]
+
+# Directories that are regenerated by npm/astro and must not affect the hash
+# of a project's source tree.
+IGNORED_DIRS = {"node_modules", "dist", ".astro", ".git"}
+
+
+def hash_path(path: str) -> str:
+    """Hash a file, or a directory tree by relative path and file contents."""
+    if not os.path.exists(path):
+        return ""
+    digest = hashlib.sha256()
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode("utf-8"))
+            digest.update(hash_path(file_path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _describe(paths: dict) -> dict:
+    return {
+        name: {"path": os.path.abspath(p), "hash": hash_path(p)}
+        for name, p in paths.items()
+    }
+
+
+def load_checkpoints() -> dict:
+    """Load all recorded stage checkpoints."""
+    try:
+        with open(CHECKPOINT_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def session_id(tool_context: ToolContext = None) -> Optional[str]:
+    """Return the id of the ADK session a tool call belongs to, or None outside one."""
+    return tool_context.session.id if tool_context is not None else None
+
+
+def record_checkpoint(stage: str, inputs: dict, outputs: dict, session: str = None) -> dict:
+    """Record a stage checkpoint with the hashes of its input and output paths.
+
+    `session` is the conversation that produced the outputs; only that
+    conversation resumes from the checkpoint.
+    """
+    try:
+        checkpoints = load_checkpoints()
+        checkpoints[stage] = {
+            "inputs": _describe(inputs),
+            "outputs": _describe(outputs),
+            "session": session,
+            "timestamp": datetime.now().isoformat(),
+        }
+        with open(CHECKPOINT_FILE, "w") as f:
+            json.dump(checkpoints, f, indent=2)
+        return {"status": "success", "stage": stage}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def claim_checkpoint(stage: str, session: str) -> None:
+    """Count a checkpoint reused from an earlier run as progress of this session."""
+    checkpoints = load_checkpoints()
+    if stage in checkpoints and session is not None:
+        checkpoints[stage]["session"] = session
+        with open(CHECKPOINT_FILE, "w") as f:
+            json.dump(checkpoints, f, indent=2)
+
+
+def _entry_is_valid(entry: dict) -> bool:
+    for group in ("inputs", "outputs"):
+        for item in entry.get(group, {}).values():
+            if not item["hash"] or hash_path(item["path"]) != item["hash"]:
+                return False
+    return True
+
+
+def find_checkpoint(stage: str, inputs: dict) -> Optional[dict]:
+    """Return the checkpoint for a stage if it was produced from identical inputs.
+
+    Returns None when there is no checkpoint, the inputs changed, or the
+    recorded outputs have been modified or removed since.
+    """
+    entry = load_checkpoints().get(stage)
+    if not entry:
+        return None
+    current = _describe(inputs)
+    recorded = entry.get("inputs", {})
+    if set(current) != set(recorded):
+        return None
+    for name, item in current.items():
+        if not item["hash"] or item != recorded[name]:
+            return None
+    if not _entry_is_valid(entry):
+        return None
+    return entry
+
+
+def get_pipeline_status(tool_context: ToolContext = None) -> dict:
+    """Report which pipeline stages this conversation completed and where it should resume.
+
+    Only checkpoints recorded by the current session count, so a new
+    conversation always starts at requirements even if an earlier user's
+    outputs are still on disk.
+    """
+    try:
+        session = session_id(tool_context)
+        checkpoints = load_checkpoints()
+        completed = {}
+        resume_stage = None
+        for stage in STAGES:
+            entry = checkpoints.get(stage)
+            if (
+                session is None
+                or not entry
+                or entry.get("session") != session
+                or not _entry_is_valid(entry)
+            ):
+                resume_stage = stage
+                break
+            completed[stage] = {
+                name: item["path"] for name, item in entry["outputs"].items()
+            }
+        return {
+            "status": "success",
+            "resuming": bool(completed),
+            "completed_stages": completed,
+            "resume_stage": resume_stage or "done",
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
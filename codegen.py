@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import component_cache
+from .model_pool import MODEL_NAME, generate_content
+
+# Upper bound on concurrent model calls for one site.
+MAX_CONCURRENCY = int(os.getenv("RAVE_CODEGEN_CONCURRENCY", "6"))
+
+FENCE_PATTERN = re.compile(r"^```[a-zA-Z]*\n(.*?)\n```\s*$", re.DOTALL)
+WORD_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+
+def _load_json(path: str) -> dict:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def component_name(name: str) -> str:
+    """Turn a planned component name such as "project-grid" into a PascalCase identifier."""
+    words = WORD_PATTERN.findall(str(name))
+    identifier = "".join(word[0].upper() + word[1:] for word in words) or "Component"
+    if identifier[0].isdigit():
+        identifier = "Component" + identifier
+    return identifier
+
+
+def plan_units(ui_plan: dict) -> dict:
+    """Split a UI plan into independent generation units.
+
+    Returns two waves: the layout and every component, which only depend on
+    the plan, and then the pages, which import the components.
+    """
+    structure = ui_plan.get("component_structure", {})
+    if not structure:
+        structure = {
+            name: spec for name, spec in ui_plan.items()
+            if isinstance(spec, dict) and spec.get("type") == "component"
+        }
+
+    components = [{"kind": "layout", "name": "Layout", "spec": {}}]
+    # Names are compared case-insensitively: pages import every component by
+    # name, and "Hero.jsx" and "hero.jsx" are one file on some filesystems.
+    taken = {"layout"}
+    for name, spec in structure.items():
+        ext = "astro" if str(spec.get("format", "")).lower() == "astro" else "jsx"
+        base = identifier = component_name(name)
+        suffix = 2
+        while identifier.lower() in taken:
+            identifier, suffix = f"{base}{suffix}", suffix + 1
+        taken.add(identifier.lower())
+        components.append({"kind": "component", "name": identifier, "ext": ext, "spec": spec})
+
+    pages = {}
+    for page in ui_plan.get("pages") or ["index"]:
+        if isinstance(page, dict):
+            name = str(page.get("name") or page.get("path") or "index").strip("/") or "index"
+            spec = page
+        else:
+            name, spec = str(page).strip("/") or "index", {}
+        # Two entries for one route would race on the same file; keep the first.
+        pages.setdefault(name.lower(), {"kind": "page", "name": name, "spec": spec})
+    return {"components": components, "pages": list(pages.values())}
+
+
+def _unit_path(project_dir: str, unit: dict) -> str:
+    if unit["kind"] == "layout":
+        return os.path.join(project_dir, "src", "layouts", f"{unit['name']}.astro")
+    if unit["kind"] == "page":
+        return os.path.join(project_dir, "src", "pages", f"{unit['name']}.astro")
+    return os.path.join(project_dir, "src", "components", f"{unit['name']}.{unit['ext']}")
+
+
+def _build_prompt(unit: dict, context: dict, components: list) -> str:
+    parts = [
+        "You are writing one file of an Astro + React + Tailwind CSS website.",
+        f"Requirements: {json.dumps(context['requirements'])}",
+        f"Design: {json.dumps(context['design'])}",
+    ]
+    if unit["kind"] == "layout":
+        parts.append(
+            "Write src/layouts/Layout.astro: the full HTML document with meta tags, "
+            "a `title` prop and a <slot />, styled with the design's colors and fonts."
+        )
+    elif unit["kind"] == "component":
+        target = "a React functional component (.jsx) with a default export" if unit["ext"] == "jsx" \
+            else "an Astro component (.astro)"
+        parts.append(
+            f"Write {target} named {unit['name']} using Tailwind classes. "
+            "Take all user-visible text from props with short generic defaults; "
+            "pages pass in the site's copy. "
+            f"Component spec: {json.dumps(unit['spec'])}"
+        )
+    else:
+        imports = ", ".join(
+            f"{c['name']} from '../components/{c['name']}.{c['ext']}'" for c in components
+        )
+        parts.append(
+            f"Write the Astro page src/pages/{unit['name']}.astro. Wrap it in Layout from "
+            f"'../layouts/Layout.astro' and import the components it needs from: {imports}. "
+            "Pass the site's text to components as props. "
+            "Give React components a client:* directive only when they are interactive. "
+            f"Page spec: {json.dumps(unit['spec'])}"
+        )
+    parts.append("Reply with the complete file contents only, no explanation.")
+    return "\n\n".join(parts)
+
+
+def _generate_unit(project_dir: str, unit: dict, context: dict, components: list) -> dict:
+    started = time.monotonic()
+    # Only components are reusable across sites: pages carry the copy and the
+    # layout the title, meta description and brand from the requirements.
+    cacheable = unit["kind"] == "component"
+    ext = unit.get("ext", "astro")
+    try:
+        code = None
+        if cacheable:
+            code = component_cache.lookup(
+                unit["name"], ext, unit["spec"], context["tokens"], context["fixed"]
+            )
+        cached = code is not None
+        if not cached:
+            response = generate_content(
+                _build_prompt(unit, context, components), model=MODEL_NAME, priority="batch"
+            )
+            code = response.text.strip()
+            match = FENCE_PATTERN.match(code)
+            if match:
+                code = match.group(1)
+            if cacheable:
+                component_cache.store(
+                    unit["name"], ext, unit["spec"], context["tokens"], context["fixed"], code
+                )
+
+        file_path = _unit_path(project_dir, unit)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(code + "\n")
+        return {
+            "status": "success",
+            "unit": unit["name"],
+            "kind": unit["kind"],
+            "file_path": file_path,
+            "cached": cached,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "unit": unit["name"],
+            "kind": unit["kind"],
+            "ext": ext,
+            "error": str(e),
+            "seconds": round(time.monotonic() - started, 2),
+        }
+
+
+def generate_site_code(project_dir: str) -> dict:
+    """Generate the layout, components and pages from ui_plan.json with concurrent model calls."""
+    try:
+        if not os.path.exists(project_dir):
+            return {"status": "error", "error": "Project directory does not exist."}
+        ui_plan = _load_json("ui_plan.json")
+        if not ui_plan:
+            return {
+                "status": "error",
+                "error": "UI plan not found. Please ensure ui_designer has saved the plan.",
+            }
+
+        context = {
+            "requirements": _load_json("requirements_data.json"),
+            "design": _load_json("design_data.json"),
+        }
+        context["tokens"] = component_cache.design_tokens(context["design"])
+        context["fixed"] = component_cache.fixed_values(context["design"], context["tokens"])
+        waves = plan_units(ui_plan)
+        components = [u for u in waves["components"] if u["kind"] == "component"]
+
+        started = time.monotonic()
+        results = []
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as pool:
+            # Pages import components, so they start once every component is written.
+            for wave in (waves["components"], waves["pages"]):
+                results.extend(
+                    pool.map(lambda u: _generate_unit(project_dir, u, context, components), wave)
+                )
+
+        failed = [r for r in results if r["status"] != "success"]
+        return {
+            "status": "partial" if failed else "success",
+            "files": [r["file_path"] for r in results if r["status"] == "success"],
+            "failed": failed,
+            "units": len(results),
+            "cache_hits": sum(1 for r in results if r.get("cached")),
+            "wall_seconds": round(time.monotonic() - started, 2),
+            "sequential_seconds": round(sum(r["seconds"] for r in results), 2),
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+CACHE_DIR = os.path.join(os.getenv("RAVE_CACHE_DIR", ".rave_cache"), "components")
+MAX_BYTES = int(float(os.getenv("RAVE_COMPONENT_CACHE_MB", "64")) * 1024 * 1024)
+STATS_FILE = "stats.json"
+
+COLOR_PATTERN = re.compile(r"^(#[0-9a-fA-F]{3,8}|(rgb|rgba|hsl|hsla)\([^)]*\))$")
+PLACEHOLDER = "@@RAVE_TOKEN:{name}@@"
+PLACEHOLDER_PATTERN = re.compile(r"@@RAVE_TOKEN:([^@]+)@@")
+# Values shorter than this are too likely to occur by accident in the code.
+MIN_VALUE_LENGTH = 4
+# Design paths whose literal values can end up in generated class names.
+STYLE_PATTERN = re.compile(r"colou?r|palette|theme|font|typograph", re.IGNORECASE)
+# Longer values are free-form descriptions rather than names such as "blue".
+MAX_FIXED_LENGTH = 40
+
+_lock = threading.Lock()
+
+
+def _flatten(data, prefix: str = "") -> dict:
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(_flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            flat.update(_flatten(value, f"{prefix}{index}."))
+    elif isinstance(data, str):
+        flat[prefix.rstrip(".")] = data.strip()
+    return flat
+
+
+def design_tokens(design: dict) -> dict:
+    """Extract the substitutable color and font tokens from mike's design data, keyed by path."""
+    tokens = {}
+    for path, value in _flatten(design).items():
+        if len(value) < MIN_VALUE_LENGTH:
+            continue
+        if COLOR_PATTERN.match(value):
+            tokens[path] = value
+        elif re.search(r"font|typograph", path, re.IGNORECASE) and len(value) < 40:
+            tokens[path] = value
+    return tokens
+
+
+def fixed_values(design: dict, tokens: dict) -> dict:
+    """The style values that are not substitutable tokens, e.g. `"colors.primary": "blue"`.
+
+    Generated code may use them literally (as `bg-blue-600`), so they have to
+    match exactly for a cached component to be reused. Free-form text such
+    as the layout or image descriptions is left out so it does not split
+    the cache.
+    """
+    return {
+        path: value for path, value in _flatten(design).items()
+        if path not in tokens and STYLE_PATTERN.search(path) and len(value) < MAX_FIXED_LENGTH
+    }
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {str(k).strip().lower(): _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return sorted((_normalize(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return value
+
+
+def cache_key(name: str, ext: str, spec: dict, tokens: dict, fixed: dict) -> str:
+    """Key a component on its normalized spec, its design token roles and its fixed style values.
+
+    Token values are not part of the key: they are substituted on reuse, so
+    the same Hero with a different hex palette is still a hit. Style values
+    that cannot be substituted (see fixed_values()) are part of the key.
+    """
+    material = {
+        "name": name.lower(),
+        "ext": ext,
+        "spec": _normalize(spec),
+        "tokens": sorted(tokens),
+        "fixed": _normalize(fixed),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _value_pattern(value: str):
+    escaped = re.escape(value)
+    if value[0].isalnum():
+        escaped = r"(?<![\w-])" + escaped
+    if value[-1].isalnum():
+        escaped += r"(?![\w-])"
+    return re.compile(escaped, re.IGNORECASE if value.startswith("#") else 0)
+
+
+def parameterize(code: str, tokens: dict) -> str:
+    """Replace design token values in code with placeholders."""
+    # Longest values first so "Playfair Display" wins over "Playfair".
+    for name, value in sorted(tokens.items(), key=lambda t: -len(t[1])):
+        placeholder = PLACEHOLDER.format(name=name)
+        code = _value_pattern(value).sub(lambda m: placeholder, code)
+    return code
+
+
+def render(template: str, tokens: dict):
+    """Fill a template's placeholders; returns None if any value is unavailable."""
+    missing = []
+
+    def fill(match):
+        value = tokens.get(match.group(1))
+        if value is None:
+            missing.append(match.group(0))
+            return match.group(0)
+        return value
+
+    code = PLACEHOLDER_PATTERN.sub(fill, template)
+    return None if missing else code
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _record(outcome: str) -> None:
+    path = os.path.join(CACHE_DIR, STATS_FILE)
+    try:
+        with open(path, "r") as f:
+            stats = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        stats = {"hits": 0, "misses": 0}
+    stats[outcome] += 1
+    with open(path + ".tmp", "w") as f:
+        json.dump(stats, f)
+    os.replace(path + ".tmp", path)
+
+
+def lookup(name: str, ext: str, spec: dict, tokens: dict, fixed: dict):
+    """Return cached code for a component with this site's design tokens, or None."""
+    key = cache_key(name, ext, spec, tokens, fixed)
+    with _lock:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        try:
+            with open(_entry_path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entry = None
+        code = render(entry["template"], tokens) if entry else None
+        if code is None:
+            _record("misses")
+            return None
+        # The file's mtime is the LRU clock.
+        os.utime(_entry_path(key), None)
+        _record("hits")
+    return code
+
+
+def store(name: str, ext: str, spec: dict, tokens: dict, fixed: dict, code: str) -> None:
+    """Save generated component code as a template and evict old entries over the size cap."""
+    key = cache_key(name, ext, spec, tokens, fixed)
+    entry = {
+        "name": name,
+        "ext": ext,
+        "template": parameterize(code, tokens),
+        "created": time.time(),
+    }
+    with _lock:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(_entry_path(key) + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(_entry_path(key) + ".tmp", _entry_path(key))
+        _evict()
+
+
+def _entries() -> list:
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".json") and name != STATS_FILE:
+            stat = os.stat(os.path.join(CACHE_DIR, name))
+            entries.append((stat.st_mtime, stat.st_size, os.path.join(CACHE_DIR, name)))
+    return sorted(entries)
+
+
+def _evict() -> None:
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= MAX_BYTES:
+            break
+        os.remove(path)
+        total -= size
+
+
+def get_component_cache_stats() -> dict:
+    """Report size, entry count and hit rate of the cross-session component cache."""
+    try:
+        with _lock:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            entries = _entries()
+            try:
+                with open(os.path.join(CACHE_DIR, STATS_FILE), "r") as f:
+                    stats = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                stats = {"hits": 0, "misses": 0}
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "status": "success",
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": MAX_BYTES,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
@@ -0,0 +1,482 @@
+import csv
+import datetime
+import json
+import os
+import re
+
+import yaml
+
+# Schemas of every ingested collection, used to regenerate content.config.ts
+# and to validate entries without running Astro.
+MANIFEST_FILE = ".collections.json"
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}([T ][\d:.]+(Z|[+-]\d{2}:?\d{2})?)?$")
+BODY_FIELDS = ("body", "content", "markdown")
+TITLE_FIELDS = ("title", "name", "heading")
+ZOD_TYPES = {
+    "string": "z.string()",
+    "number": "z.number()",
+    "boolean": "z.boolean()",
+    "date": "z.coerce.date()",
+    "object": "z.record(z.string(), z.any())",
+}
+
+
+def slugify(value: str) -> str:
+    """Turn a title into a URL slug; purely numeric slugs would clash with pagination."""
+    slug = re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-")
+    if not slug or slug.isdigit():
+        slug = f"entry-{slug}" if slug else "entry"
+    return slug
+
+
+def _coerce(value):
+    """Parse CSV and frontmatter scalars into JSON types."""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    return text.strip("'\"")
+
+
+def _plain(value):
+    """Turn YAML dates into ISO strings so entries stay JSON-serializable."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def parse_markdown(source: str, dropped: list = None, errors: list = None) -> dict:
+    """Split a Markdown file into its YAML frontmatter fields and its body.
+
+    Frontmatter that is not valid YAML falls back to plain `key: value`
+    lines; every other line is appended to `dropped`, and the YAML error to
+    `errors`, so they can be reported.
+    """
+    fields = {}
+    body = source
+    if source.startswith("---"):
+        end = source.find("\n---", 3)
+        if end != -1:
+            frontmatter = source[3:end]
+            try:
+                data = yaml.safe_load(frontmatter)
+                problem = None if isinstance(data, (dict, type(None))) else "not a mapping"
+            except yaml.YAMLError as e:
+                data, problem = None, " ".join(str(e).split())
+            if problem and errors is not None:
+                errors.append(f"invalid YAML frontmatter: {problem}")
+            if isinstance(data, dict):
+                fields.update(_plain(data))
+            else:
+                for line in frontmatter.strip().splitlines():
+                    if ":" in line and not line.startswith((" ", "\t", "-")):
+                        key, value = line.split(":", 1)
+                        fields[key.strip()] = _coerce(value)
+                    elif line.strip() and dropped is not None:
+                        dropped.append(line.strip())
+            body = source[end + 4:].lstrip("\n")
+    fields["body"] = body
+    return fields
+
+
+def load_entries(source_path: str, dropped: dict = None) -> list:
+    """Read entries from a JSON file, a CSV file, or a Markdown file or directory.
+
+    Frontmatter lines that could not be parsed are collected in `dropped`,
+    keyed by file name.
+    """
+    dropped = {} if dropped is None else dropped
+    if os.path.isdir(source_path):
+        entries = []
+        for name in sorted(os.listdir(source_path)):
+            if name.endswith((".md", ".markdown")):
+                lines = []
+                with open(os.path.join(source_path, name), "r", encoding="utf-8") as f:
+                    entry = parse_markdown(f.read(), lines)
+                if lines:
+                    dropped[name] = lines
+                entry.setdefault("slug", os.path.splitext(name)[0])
+                entries.append(entry)
+        return entries
+
+    ext = os.path.splitext(source_path)[1].lower()
+    with open(source_path, "r", encoding="utf-8", newline="") as f:
+        if ext == ".json":
+            data = json.load(f)
+            if isinstance(data, dict):
+                # Accept {"items": [...]} style wrappers.
+                data = next((v for v in data.values() if isinstance(v, list)), [data])
+            return [dict(item) for item in data]
+        if ext == ".csv":
+            return [
+                {key: _coerce(value) for key, value in row.items() if key}
+                for row in csv.DictReader(f)
+            ]
+        if ext in (".md", ".markdown"):
+            lines = []
+            entry = parse_markdown(f.read(), lines)
+            if lines:
+                dropped[os.path.basename(source_path)] = lines
+            return [entry]
+    raise ValueError(f"Unsupported content format: {ext or source_path}")
+
+
+def _field_type(value) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, str) and DATE_PATTERN.match(value):
+        return "date"
+    return "string"
+
+
+def _item_type(value) -> str:
+    """Type of an array element; dates stay strings and nested arrays are not typed."""
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "mixed"
+    kind = _field_type(value)
+    return "string" if kind == "date" else kind
+
+
+def _items_type(values: list, current: str = None) -> str:
+    kinds = {_item_type(v) for v in values}
+    if current is not None:
+        kinds.add(current)
+    if len(kinds) == 1 and "mixed" not in kinds:
+        return kinds.pop()
+    # Mixed or nested elements are stringified.
+    return "string"
+
+
+def infer_schema(entries: list) -> dict:
+    """Infer field types, array element types and which fields every entry has."""
+    schema = {}
+    for entry in entries:
+        for key, value in entry.items():
+            if key in BODY_FIELDS or key == "slug" or value in (None, ""):
+                continue
+            kind = _field_type(value)
+            field = schema.setdefault(key, {"type": kind, "count": 0})
+            if field["type"] != kind:
+                # Mixed values fall back to the most permissive type.
+                field["type"] = "string"
+            if kind == "array" and value:
+                field["items"] = _items_type(value, field.get("items"))
+            field["count"] += 1
+    result = {}
+    for key, field in schema.items():
+        result[key] = {"type": field["type"], "required": field["count"] == len(entries)}
+        if field["type"] == "array":
+            result[key]["items"] = field.get("items", "string")
+    return result
+
+
+def _check_entry(fields: dict, schema: dict) -> list:
+    errors = []
+    for key, field in schema.items():
+        value = fields.get(key)
+        if value in (None, ""):
+            if field["required"]:
+                errors.append(f"missing required field '{key}'")
+            continue
+        kind = _field_type(value)
+        if field["type"] == "string" and kind == "date":
+            continue
+        if kind != field["type"]:
+            errors.append(f"'{key}' should be {field['type']}, got {kind}")
+        elif kind == "array":
+            items = field.get("items", "string")
+            wrong = sorted({_item_type(v) for v in value} - {items})
+            if wrong:
+                errors.append(f"'{key}' should contain {items} items, got {', '.join(wrong)}")
+    return errors
+
+
+def _stringify(value) -> str:
+    return json.dumps(value) if isinstance(value, (list, dict)) else str(value)
+
+
+def _conform(value, field: dict):
+    """Convert a value to its schema type so zod accepts it."""
+    kind = field["type"]
+    if kind == "string" and not isinstance(value, str):
+        return _stringify(value)
+    if kind == "array":
+        if not isinstance(value, list):
+            value = [value]
+        if field.get("items", "string") == "string":
+            return [v if isinstance(v, str) else _stringify(v) for v in value]
+    return value
+
+
+def _frontmatter(fields: dict) -> str:
+    # YAML is a superset of JSON, so JSON-encoded values keep their types.
+    # Keys are quoted too: CSV headers such as "@handle" or "a: b" are not plain YAML keys.
+    lines = [
+        f"{json.dumps(key, ensure_ascii=False)}: {json.dumps(value, ensure_ascii=False)}"
+        for key, value in fields.items()
+    ]
+    return "---\n" + "\n".join(lines) + "\n---\n"
+
+
+def _write_if_changed(path: str, text: str) -> bool:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
+def _load_manifest(content_dir: str) -> dict:
+    try:
+        with open(os.path.join(content_dir, MANIFEST_FILE), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _identifier(collection: str) -> str:
+    name = re.sub(r"\W+", "_", collection)
+    return f"_{name}" if name[0].isdigit() else name
+
+
+def _write_config(project_dir: str, manifest: dict) -> str:
+    """Regenerate src/content.config.ts with a zod schema per collection."""
+    blocks = []
+    for collection, info in sorted(manifest.items()):
+        fields = []
+        for key, field in info["schema"].items():
+            if field["type"] == "array":
+                zod = f"z.array({ZOD_TYPES[field.get('items', 'string')]})"
+            else:
+                zod = ZOD_TYPES[field["type"]]
+            if not field["required"]:
+                zod += ".optional()"
+            fields.append(f"    {json.dumps(key)}: {zod},")
+        blocks.append(
+            f"const {_identifier(collection)} = defineCollection({{\n"
+            f"  loader: glob({{ pattern: '**/*.md', base: './src/content/{collection}' }}),\n"
+            "  schema: z.object({\n" + "\n".join(fields) + "\n  }),\n});\n"
+        )
+    exports = ", ".join(
+        f"{json.dumps(c)}: {_identifier(c)}" for c in sorted(manifest)
+    )
+    config = (
+        "import { defineCollection, z } from 'astro:content';\n"
+        "import { glob } from 'astro/loaders';\n\n"
+        + "\n".join(blocks)
+        + f"\nexport const collections = {{ {exports} }};\n"
+    )
+    path = os.path.join(project_dir, "src", "content.config.ts")
+    _write_if_changed(path, config)
+    return path
+
+
+def _layout_import(project_dir: str, depth: int) -> tuple:
+    layout = os.path.join(project_dir, "src", "layouts", "Layout.astro")
+    if not os.path.exists(layout):
+        return "", "<html><head><title>{title}</title></head><body>", "</body></html>"
+    prefix = "../" * depth
+    return (
+        f"import Layout from '{prefix}layouts/Layout.astro';\n",
+        "<Layout title={title}>",
+        "</Layout>",
+    )
+
+
+def _write_routes(project_dir: str, collection: str, schema: dict, page_size: int) -> list:
+    """Write [slug].astro and paginated [...page].astro routes for a collection."""
+    pages_dir = os.path.join(project_dir, "src", "pages", collection)
+    os.makedirs(pages_dir, exist_ok=True)
+    title_field = next((f for f in TITLE_FIELDS if f in schema), None)
+    title_expr = f"entry.data[{json.dumps(title_field)}]" if title_field else "entry.id"
+    date_field = next((k for k, f in schema.items() if f["type"] == "date"), None)
+    sort = (
+        f"\n  entries.sort((a, b) => +new Date(b.data[{json.dumps(date_field)}] ?? 0)"
+        f" - +new Date(a.data[{json.dumps(date_field)}] ?? 0));"
+        if date_field else ""
+    )
+    depth = 2 + collection.count("/")
+    layout_import, open_tag, close_tag = _layout_import(project_dir, depth)
+    name = json.dumps(collection)
+
+    entry_page = (
+        "---\n"
+        "import { getCollection, render } from 'astro:content';\n"
+        f"{layout_import}\n"
+        "export async function getStaticPaths() {\n"
+        f"  const entries = await getCollection({name});\n"
+        "  return entries.map((entry) => ({ params: { slug: entry.id }, props: { entry } }));\n"
+        "}\n\n"
+        "const { entry } = Astro.props;\n"
+        "const { Content } = await render(entry);\n"
+        f"const title = {title_expr};\n"
+        "---\n"
+        f"{open_tag}\n"
+        '  <article class="prose mx-auto max-w-3xl px-6 py-12">\n'
+        '    <h1 class="text-4xl font-bold">{title}</h1>\n'
+        "    <Content />\n"
+        "  </article>\n"
+        f"{close_tag}\n"
+    )
+    list_page = (
+        "---\n"
+        "import { getCollection } from 'astro:content';\n"
+        f"{layout_import}\n"
+        "export async function getStaticPaths({ paginate }) {\n"
+        f"  const entries = await getCollection({name});{sort}\n"
+        f"  return paginate(entries, {{ pageSize: {int(page_size)} }});\n"
+        "}\n\n"
+        "const { page } = Astro.props;\n"
+        f"const title = {json.dumps(collection.replace('-', ' ').title())};\n"
+        "---\n"
+        f"{open_tag}\n"
+        '  <section class="mx-auto max-w-5xl px-6 py-12">\n'
+        '    <h1 class="text-4xl font-bold mb-8">{title}</h1>\n'
+        '    <ul class="grid gap-6 sm:grid-cols-2 lg:grid-cols-3">\n'
+        "      {page.data.map((entry) => (\n"
+        '        <li class="rounded-lg border p-6 hover:shadow-lg transition-shadow">\n'
+        f'          <a href={{`/{collection}/${{entry.id}}/`}} class="text-xl font-semibold">'
+        f"{{{title_expr}}}</a>\n"
+        "        </li>\n"
+        "      ))}\n"
+        "    </ul>\n"
+        '    <nav class="mt-10 flex justify-between">\n'
+        '      {page.url.prev ? <a href={page.url.prev}>&larr; Newer</a> : <span />}\n'
+        '      {page.url.next ? <a href={page.url.next}>Older &rarr;</a> : <span />}\n'
+        "    </nav>\n"
+        "  </section>\n"
+        f"{close_tag}\n"
+    )
+
+    written = []
+    for filename, text in (("[slug].astro", entry_page), ("[...page].astro", list_page)):
+        path = os.path.join(pages_dir, filename)
+        _write_if_changed(path, text)
+        written.append(path)
+    return written
+
+
+def ingest_content(project_dir: str, collection: str, source_path: str, page_size: int = 12) -> dict:
+    """Bulk-load JSON, CSV or Markdown content into an Astro collection with paginated routes."""
+    try:
+        if not os.path.exists(project_dir):
+            return {"status": "error", "error": "Project directory does not exist."}
+        if not os.path.exists(source_path):
+            return {"status": "error", "error": f"Content source {source_path} does not exist."}
+
+        dropped = {}
+        entries = load_entries(source_path, dropped)
+        if not entries:
+            return {"status": "error", "error": f"No entries found in {source_path}."}
+        schema = infer_schema(entries)
+
+        content_dir = os.path.join(project_dir, "src", "content")
+        collection_dir = os.path.join(content_dir, collection)
+        os.makedirs(collection_dir, exist_ok=True)
+
+        slugs = set()
+        written = unchanged = 0
+        for entry in entries:
+            base = entry.get("slug") or next(
+                (entry[f] for f in TITLE_FIELDS if entry.get(f)), None
+            ) or entry.get("id") or len(slugs) + 1
+            slug = slugify(base)
+            candidate, n = slug, 2
+            while candidate in slugs:
+                candidate, n = f"{slug}-{n}", n + 1
+            slugs.add(candidate)
+
+            body = next((entry[f] for f in BODY_FIELDS if entry.get(f)), "")
+            fields = {
+                k: _conform(v, schema[k]) for k, v in entry.items()
+                if k in schema and v not in (None, "")
+            }
+            text = _frontmatter(fields) + "\n" + str(body).strip() + "\n"
+            if _write_if_changed(os.path.join(collection_dir, f"{candidate}.md"), text):
+                written += 1
+            else:
+                unchanged += 1
+
+        # Drop entries that are no longer in the source.
+        removed = 0
+        for name in os.listdir(collection_dir):
+            if name.endswith(".md") and name[:-3] not in slugs:
+                os.remove(os.path.join(collection_dir, name))
+                removed += 1
+
+        manifest = _load_manifest(content_dir)
+        manifest[collection] = {"schema": schema, "source": os.path.abspath(source_path)}
+        with open(os.path.join(content_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+        config_path = _write_config(project_dir, manifest)
+        routes = _write_routes(project_dir, collection, schema, page_size)
+
+        validation = validate_content(project_dir, collection)
+        return {
+            "status": "success" if validation.get("valid") else "error",
+            "collection": collection,
+            "entries": len(entries),
+            "written": written,
+            "unchanged": unchanged,
+            "removed": removed,
+            "schema": schema,
+            "dropped_frontmatter": dropped,
+            "config_file": config_path,
+            "routes": routes,
+            "pages": -(-len(entries) // int(page_size)) + len(entries),
+            "validation": validation,
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def validate_content(project_dir: str, collection: str) -> dict:
+    """Check every entry of a collection against its inferred schema without running Astro."""
+    try:
+        content_dir = os.path.join(project_dir, "src", "content")
+        info = _load_manifest(content_dir).get(collection)
+        if info is None:
+            return {"status": "error", "error": f"Collection '{collection}' has not been ingested."}
+
+        collection_dir = os.path.join(content_dir, collection)
+        errors = {}
+        count = 0
+        for name in sorted(os.listdir(collection_dir)):
+            if not name.endswith(".md"):
+                continue
+            count += 1
+            problems = []
+            with open(os.path.join(collection_dir, name), "r", encoding="utf-8") as f:
+                entry = parse_markdown(f.read(), errors=problems)
+            problems += _check_entry(entry, info["schema"])
+            if problems:
+                errors[name] = problems
+        return {
+            "status": "success",
+            "valid": not errors,
+            "entries": count,
+            # Keep the report short for very large collections.
+            "errors": dict(list(errors.items())[:50]),
+            "invalid_entries": len(errors),
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
@@ -0,0 +1,293 @@
+import os
+import re
+
+# Approximate size of the React + ReactDOM client runtime Astro ships with
+# the first hydrated React island on a page.
+REACT_RUNTIME_BYTES = 140_000
+
+REACT_EXTENSIONS = (".jsx", ".tsx", ".js", ".ts")
+STATEFUL_PATTERN = re.compile(
+    r"\buse(State|Reducer|Effect|LayoutEffect|Ref|Context|Transition|SyncExternalStore)\b"
+    r"|\buse[A-Z]\w*\s*\("
+)
+EFFECT_ONLY_PATTERN = re.compile(r"\buse(Effect|LayoutEffect)\b")
+HANDLER_PATTERN = re.compile(r"\bon[A-Z]\w*\s*=\s*\{")
+BROWSER_PATTERN = re.compile(r"\b(window|document|localStorage|sessionStorage|navigator)\.")
+IMPORT_PATTERN = re.compile(
+    r"import\s+(\w+)\s*(?:,\s*\{[^}]*\})?\s*from\s*['\"](\.{1,2}/[^'\"]+)['\"]"
+)
+PACKAGE_IMPORT_PATTERN = re.compile(r"(?:\bfrom|^\s*import)\s*['\"]([^'\"./][^'\"]*)['\"]", re.MULTILINE)
+# Packages that never need client-side JS of their own. Any other package a
+# component imports (e.g. @headlessui/react, framer-motion) may be interactive.
+STATIC_PACKAGES = {
+    "react",
+    "react-dom",
+    "lucide-react",
+    "react-icons",
+    "@heroicons/react",
+    "clsx",
+    "classnames",
+}
+DIRECTIVE_PATTERN = re.compile(
+    r"\s+client:(load|idle|visible)(?:=(?:\"[^\"]*\"|'[^']*'|\{[^}]*\}))?"
+)
+# Components users expect to respond immediately, e.g. a mobile menu toggle.
+EAGER_NAMES = re.compile(r"nav|header|menu|modal|dialog|cart|search", re.IGNORECASE)
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _resolve(base_dir: str, spec: str):
+    path = os.path.normpath(os.path.join(base_dir, spec))
+    if os.path.isfile(path):
+        return path
+    for ext in REACT_EXTENSIONS + (".astro",):
+        if os.path.isfile(path + ext):
+            return path + ext
+    return None
+
+
+def _local_imports(path: str, source: str) -> dict:
+    """Map imported names to resolved local file paths."""
+    imports = {}
+    for name, spec in IMPORT_PATTERN.findall(source):
+        resolved = _resolve(os.path.dirname(path), spec)
+        if resolved:
+            imports[name] = resolved
+    return imports
+
+
+def _package_imports(source: str) -> list:
+    """Return the imported third-party packages that may need client-side JS."""
+    packages = set()
+    for spec in PACKAGE_IMPORT_PATTERN.findall(source):
+        parts = spec.split("/")
+        package = "/".join(parts[:2]) if spec.startswith("@") else parts[0]
+        if package not in STATIC_PACKAGES:
+            packages.add(package)
+    return sorted(packages)
+
+
+def analyze_component(path: str, cache: dict = None) -> dict:
+    """Classify a React component as static or interactive, following local imports.
+
+    A component whose only sign of interactivity is a third-party import is
+    treated as interactive but marked "uncertain".
+    """
+    cache = {} if cache is None else cache
+    if path in cache:
+        return cache[path]
+    # Guard against import cycles while the entry is being computed.
+    cache[path] = {
+        "interactive": False,
+        "uncertain": False,
+        "effect_only": False,
+        "bytes": 0,
+        "deps": [],
+        "packages": [],
+    }
+
+    source = _read(path)
+    handlers = bool(HANDLER_PATTERN.search(source))
+    stateful = bool(STATEFUL_PATTERN.search(source))
+    browser = bool(BROWSER_PATTERN.search(source))
+    interactive = handlers or stateful or browser
+    packages = _package_imports(source)
+    uncertain = bool(packages)
+    effect_only = bool(EFFECT_ONLY_PATTERN.search(source)) and not handlers and not packages
+    size = len(source.encode("utf-8"))
+    deps = []
+    for dep in _local_imports(path, source).values():
+        if not dep.endswith(REACT_EXTENSIONS):
+            continue
+        info = analyze_component(dep, cache)
+        deps.append(dep)
+        size += info["bytes"]
+        if info["interactive"] and not info["uncertain"]:
+            interactive = True
+            effect_only = effect_only and info["effect_only"]
+        elif info["uncertain"]:
+            uncertain = True
+            effect_only = False
+
+    cache[path] = {
+        "interactive": interactive or uncertain,
+        "uncertain": uncertain and not interactive,
+        "effect_only": interactive and effect_only,
+        "bytes": size,
+        "deps": deps,
+        "packages": packages,
+    }
+    return cache[path]
+
+
+def choose_directive(name: str, info: dict, first_on_page: bool):
+    """Pick the lightest client directive that keeps a component working."""
+    if not info["interactive"]:
+        return None
+    if EAGER_NAMES.search(name):
+        return "load"
+    if info["effect_only"]:
+        # Animations, timers and similar only matter once they are on screen.
+        return "visible"
+    return "idle" if first_on_page else "visible"
+
+
+def _tag_end(source: str, start: int):
+    """Return the index just past the `>` closing the tag at `start`, or None.
+
+    Attribute values may be quoted strings or {expressions} that contain
+    `>`, quotes, nested braces or template literals of their own.
+    """
+    depth = 0
+    quote = None
+    index = start + 1
+    while index < len(source):
+        char = source[index]
+        if quote:
+            if char == "\\":
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'`":
+            quote = char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth < 0:
+                return None
+        elif depth == 0 and char == ">":
+            return index + 1
+        elif depth == 0 and char == "<":
+            return None
+        index += 1
+    return None
+
+
+def plan_page(path: str, cache: dict, apply: bool) -> dict:
+    """Assign client directives to every React island used by one .astro file."""
+    source = _read(path)
+    react_imports = {
+        name: dep for name, dep in _local_imports(path, source).items()
+        if dep.endswith(REACT_EXTENSIONS)
+    }
+    if not react_imports:
+        return {
+            "islands": [],
+            "static_components": [],
+            "skipped_tags": [],
+            "js_bytes_saved": 0,
+            "js_bytes_deferred": 0,
+        }
+
+    # Only rewrite the template, never the frontmatter script.
+    body_start = 0
+    if source.startswith("---") and source.find("---", 3) != -1:
+        body_start = source.find("---", 3) + 3
+    tag_pattern = re.compile(r"<(" + "|".join(map(re.escape, react_imports)) + r")\b")
+    islands = []
+    skipped = []
+
+    def rewrite(name, original):
+        existing = DIRECTIVE_PATTERN.search(original)
+        if existing is None and "client:" in original:
+            # client:only / client:media were chosen deliberately; leave them alone.
+            return original
+        info = analyze_component(react_imports[name], cache)
+        first = not any(i["after"] for i in islands)
+        if existing is not None and info["uncertain"]:
+            # Third-party widgets may need JS we cannot see; trust the author.
+            directive = existing.group(1)
+        else:
+            directive = choose_directive(name, info, first)
+
+        tag = DIRECTIVE_PATTERN.sub("", original)
+        if directive:
+            self_closing = tag.endswith("/>")
+            tag = tag[: -2 if self_closing else -1].rstrip() + f" client:{directive}"
+            tag += " />" if self_closing else ">"
+        islands.append(
+            {
+                "component": name,
+                "before": f"client:{existing.group(1)}" if existing else None,
+                "after": f"client:{directive}" if directive else None,
+                "bytes": info["bytes"],
+            }
+        )
+        return tag
+
+    parts = [source[:body_start]]
+    position = body_start
+    for match in tag_pattern.finditer(source, body_start):
+        if match.start() < position:
+            continue
+        end = _tag_end(source, match.start())
+        if end is None:
+            # Leave tags we cannot parse exactly as they are.
+            skipped.append(match.group(1))
+            continue
+        parts.append(source[position:match.start()])
+        parts.append(rewrite(match.group(1), source[match.start():end]))
+        position = end
+    parts.append(source[position:])
+    rewritten = "".join(parts)
+
+    # A component's JS is shipped once per page however often it is used.
+    sizes = {i["component"]: i["bytes"] for i in islands}
+    hydrated_before = {i["component"] for i in islands if i["before"]}
+    hydrated_after = {i["component"] for i in islands if i["after"]}
+    eager_before = {i["component"] for i in islands if i["before"] == "client:load"}
+    eager_after = {i["component"] for i in islands if i["after"] == "client:load"}
+    saved = sum(sizes[name] for name in hydrated_before - hydrated_after)
+    if hydrated_before and not hydrated_after:
+        saved += REACT_RUNTIME_BYTES
+    deferred = sum(sizes[name] for name in (eager_before & hydrated_after) - eager_after)
+
+    if apply and rewritten != source:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(rewritten)
+    return {
+        "islands": islands,
+        "static_components": sorted({i["component"] for i in islands if not i["after"]}),
+        "skipped_tags": skipped,
+        "js_bytes_saved": saved,
+        "js_bytes_deferred": deferred,
+    }
+
+
+def plan_hydration(project_dir: str, apply: bool = True) -> dict:
+    """Render static React components without JS and give the rest the lightest client directive."""
+    try:
+        if not os.path.exists(project_dir):
+            return {"status": "error", "error": "Project directory does not exist."}
+
+        cache = {}
+        pages = {}
+        src_dir = os.path.join(project_dir, "src")
+        for root, dirs, files in os.walk(src_dir):
+            for name in sorted(files):
+                if name.endswith(".astro"):
+                    path = os.path.join(root, name)
+                    pages[os.path.relpath(path, project_dir)] = plan_page(path, cache, apply)
+
+        return {
+            "status": "success",
+            "applied": apply,
+            "pages": pages,
+            "interactive_components": sorted(
+                os.path.basename(p) for p, info in cache.items() if info["interactive"]
+            ),
+            "static_components": sorted(
+                os.path.basename(p) for p, info in cache.items() if not info["interactive"]
+            ),
+            "uncertain_components": sorted(
+                os.path.basename(p) for p, info in cache.items() if info["uncertain"]
+            ),
+            "total_js_bytes_saved": sum(p["js_bytes_saved"] for p in pages.values()),
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
@@ -1,6 +1,10 @@
 import json
 
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
+
+from .checkpoint import record_checkpoint, session_id
+from .model_pool import interactive_model
 
 
 def ask_colors() -> dict:
@@ -25,11 +29,17 @@ def ask_images() -> dict:
     return {"question": "Do you have specific images, logos, or media requirements?"}
 
 
-def save_design_data(data: dict) -> dict:
+def save_design_data(data: dict, tool_context: ToolContext = None) -> dict:
     """Save the gathered design data to a JSON file for other agents to access."""
     try:
         with open("design_data.json", "w") as f:
             json.dump(data, f)
+        record_checkpoint(
+            "design",
+            {"requirements": "requirements_data.json"},
+            {"design": "design_data.json"},
+            session_id(tool_context),
+        )
         return {"status": "success", "message": "Design data saved to design_data.json"}
     except Exception as e:
         return {"status": "error", "error": str(e)}
@@ -37,7 +47,7 @@ def save_design_data(data: dict) -> dict:
 
 mike_agent = Agent(
     name="mike",
-    model="gemini-2.0-flash",
+    model=interactive_model,
     description=(
         "Design agent that handles design aspects, asking about colors, layout, fonts, and visuals."
     ),
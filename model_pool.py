@@ -0,0 +1,146 @@
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+from google import genai
+from google.adk.models.google_llm import Gemini
+from google.genai import errors, types
+
+from .rate_limit import PRIORITIES, LatencyStats, RateLimiter, backoff_delay
+
+MODEL_NAME = os.getenv("MODEL_NAME", "gemini-2.0-flash")
+# Point every agent at a different endpoint, e.g. a local mock server in tests.
+BASE_URL = os.getenv("RAVE_MODEL_BASE_URL")
+REQUESTS_PER_MINUTE = float(os.getenv("RAVE_MODEL_RPM", "60"))
+TOKENS_PER_MINUTE = float(os.getenv("RAVE_MODEL_TPM", "1000000"))
+MAX_RETRIES = int(os.getenv("RAVE_MODEL_MAX_RETRIES", "5"))
+# Output tokens assumed for a call until the response reports real usage.
+EXPECTED_OUTPUT_TOKENS = 1024
+RETRY_CODES = {429, 500, 502, 503, 504}
+
+limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+stats = LatencyStats()
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> genai.Client:
+    """Return the process-wide genai client used by generate_content()."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            options = types.HttpOptions(base_url=BASE_URL) if BASE_URL else None
+            _client = genai.Client(http_options=options)
+        return _client
+
+
+def _estimate_tokens(contents) -> int:
+    """Roughly four characters per token, plus the expected output."""
+    if isinstance(contents, str):
+        chars = len(contents)
+    else:
+        chars = 0
+        for content in contents or []:
+            for part in getattr(content, "parts", None) or []:
+                chars += len(getattr(part, "text", None) or "")
+    return chars // 4 + EXPECTED_OUTPUT_TOKENS
+
+
+def _used_tokens(response, estimated: int) -> int:
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None) or estimated
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRY_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def _on_failure(error: Exception, attempt: int) -> float:
+    """Count a failed attempt and return how long to back off before retrying."""
+    delay = backoff_delay(attempt)
+    stats.count("retries")
+    if isinstance(error, errors.APIError) and error.code == 429:
+        # The quota is shared, so every session backs off, not just this one.
+        stats.count("rate_limited")
+        limiter.pause(delay)
+    return delay
+
+
+def generate_content(contents, model: str = MODEL_NAME, priority: str = "batch", config=None):
+    """Call the model synchronously through the shared client, limiter and retry policy."""
+    estimated = _estimate_tokens(contents)
+    attempt = 0
+    while True:
+        waited = limiter.acquire(PRIORITIES[priority], estimated)
+        started = time.monotonic()
+        try:
+            response = get_client().models.generate_content(
+                model=model, contents=contents, config=config
+            )
+        except Exception as e:
+            stats.add(waited, time.monotonic() - started, ok=False)
+            if not _retryable(e) or attempt >= MAX_RETRIES:
+                raise
+            time.sleep(_on_failure(e, attempt))
+            attempt += 1
+            continue
+        stats.add(waited, time.monotonic() - started, ok=True)
+        limiter.record_usage(estimated, _used_tokens(response, estimated))
+        return response
+
+
+class PooledGemini(Gemini):
+    """Gemini model for ADK agents that goes through the shared limiter and retry policy.
+
+    ADK keeps its own client per event loop; the limiter is what all agents
+    and sessions of the process share.
+    """
+
+    priority: str = "batch"
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        estimated = _estimate_tokens(llm_request.contents)
+        attempt = 0
+        while True:
+            waited = await limiter.acquire_async(PRIORITIES[self.priority], estimated)
+            started = time.monotonic()
+            last = None
+            try:
+                async for response in super().generate_content_async(llm_request, stream):
+                    last = response
+                    yield response
+            except Exception as e:
+                stats.add(waited, time.monotonic() - started, ok=False)
+                # A partially streamed answer cannot be retried transparently.
+                if last is not None or not _retryable(e) or attempt >= MAX_RETRIES:
+                    raise
+                await asyncio.sleep(_on_failure(e, attempt))
+                attempt += 1
+                continue
+            stats.add(waited, time.monotonic() - started, ok=True)
+            limiter.record_usage(estimated, _used_tokens(last, estimated))
+            return
+
+
+# Agents that talk to the user are admitted ahead of background generation.
+interactive_model = PooledGemini(model=MODEL_NAME, base_url=BASE_URL, priority="interactive")
+batch_model = PooledGemini(model=MODEL_NAME, base_url=BASE_URL, priority="batch")
+
+
+def get_model_pool_stats() -> dict:
+    """Report model call counts, queue lengths, queue wait and latency percentiles."""
+    try:
+        return {
+            "status": "success",
+            "queued": limiter.queued(),
+            "requests_per_minute": REQUESTS_PER_MINUTE,
+            "tokens_per_minute": TOKENS_PER_MINUTE,
+            **stats.snapshot(),
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
@@ -3,6 +3,11 @@ import shutil
 import zipfile
 
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
+
+from .checkpoint import claim_checkpoint, find_checkpoint, record_checkpoint, session_id
+from .model_pool import batch_model
+from .workspace import register, unpin
 
 
 def organize_files(source_dir: str, dest_dir: str) -> dict:
@@ -25,12 +30,38 @@ def organize_files(source_dir: str, dest_dir: str) -> dict:
         return {"status": "error", "error": str(e)}
 
 
-def zip_website(source_dir: str, output_name: str = "website") -> dict:
+def _release_project(source_dir: str) -> None:
+    """Unpin the project a build directory belongs to once it has been zipped."""
+    source_dir = os.path.abspath(source_dir)
+    if os.path.basename(source_dir) == "dist":
+        source_dir = os.path.dirname(source_dir)
+    unpin(source_dir)
+
+
+def zip_website(
+    source_dir: str, output_name: str = "website", tool_context: ToolContext = None
+) -> dict:
     """Pack the website directory into a zip file in the current directory."""
     try:
         if not os.path.exists(source_dir):
             return {"status": "error", "error": f"Source directory {source_dir} does not exist."}
-        
+
+        # Reuse the archive from an earlier run if the build output is unchanged
+        entry = find_checkpoint("zip", {"dist": source_dir})
+        if entry is not None:
+            claim_checkpoint("zip", session_id(tool_context))
+            _release_project(source_dir)
+            zip_path = entry["outputs"]["zip"]["path"]
+            file_size = os.path.getsize(zip_path)
+            return {
+                "status": "success",
+                "cached": True,
+                "zip_file": zip_path,
+                "filename": os.path.basename(zip_path),
+                "size_bytes": file_size,
+                "message": f"Build unchanged; reusing {os.path.basename(zip_path)} ({file_size} bytes)"
+            }
+
         # Create zip in current directory with timestamp
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -44,6 +75,9 @@ def zip_website(source_dir: str, output_name: str = "website") -> dict:
                     arcname = os.path.relpath(file_path, source_dir)
                     zipf.write(file_path, arcname)
         
+        register(zip_path)
+        record_checkpoint("zip", {"dist": source_dir}, {"zip": zip_path}, session_id(tool_context))
+        _release_project(source_dir)
         file_size = os.path.getsize(zip_path)
         return {
             "status": "success",
@@ -79,7 +113,7 @@ def deliver_to_user(zip_path: str) -> dict:
 
 pack_agent = Agent(
     name="pack",
-    model="gemini-2.0-flash",
+    model=batch_model,
     description="Agent that packs the built website into a zip file and delivers it to the user.",
     instruction="""You are the packager agent. When called, introduce yourself first.
 
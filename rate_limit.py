@@ -0,0 +1,155 @@
+import asyncio
+import random
+import threading
+import time
+
+# Lower numbers are admitted first.
+PRIORITIES = {"interactive": 0, "batch": 1}
+# How long a waiter sleeps between admission checks at most.
+MAX_POLL_SECONDS = 0.25
+
+
+class TokenBucket:
+    """A bucket refilled continuously at `per_minute` units, holding at most one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A request larger than the bucket is admitted once the bucket is full.
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier estimate once the real usage is known."""
+        self.level = min(self.capacity, self.level - amount)
+
+
+class RateLimiter:
+    """Process-wide request and token limits with priority admission.
+
+    A lower-priority caller is never admitted while a higher-priority one is
+    waiting, so interactive turns overtake queued batch work. A provider-side
+    rate limit (429) pauses every caller, not just the one that hit it.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self.waiting = {priority: 0 for priority in PRIORITIES.values()}
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, priority: int, tokens: float) -> float:
+        """Admit the caller and return 0, or return how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if any(count for p, count in self.waiting.items() if p < priority):
+                return MAX_POLL_SECONDS
+            wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            return 0.0
+
+    def _enter(self, priority: int) -> None:
+        with self._lock:
+            self.waiting[priority] += 1
+
+    def _leave(self, priority: int) -> None:
+        with self._lock:
+            self.waiting[priority] -= 1
+
+    def acquire(self, priority: int, tokens: float) -> float:
+        """Block until admitted; returns the seconds spent waiting."""
+        started = time.monotonic()
+        self._enter(priority)
+        try:
+            while True:
+                wait = self._try_acquire(priority, tokens)
+                if wait == 0:
+                    return time.monotonic() - started
+                time.sleep(min(wait, MAX_POLL_SECONDS))
+        finally:
+            self._leave(priority)
+
+    async def acquire_async(self, priority: int, tokens: float) -> float:
+        """Await admission without blocking the event loop; returns the seconds waited."""
+        started = time.monotonic()
+        self._enter(priority)
+        try:
+            while True:
+                wait = self._try_acquire(priority, tokens)
+                if wait == 0:
+                    return time.monotonic() - started
+                await asyncio.sleep(min(wait, MAX_POLL_SECONDS))
+        finally:
+            self._leave(priority)
+
+    def record_usage(self, estimated: float, actual: float) -> None:
+        with self._lock:
+            self.tokens.adjust(actual - estimated)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller, e.g. after the provider returned 429."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def queued(self) -> dict:
+        with self._lock:
+            return {name: self.waiting[p] for name, p in PRIORITIES.items()}
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter, so retries from many sessions spread out."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyStats:
+    """Rolling samples of queue wait and call latency."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.samples = {"queue_wait": [], "latency": []}
+        self.counters = {"calls": 0, "errors": 0, "retries": 0, "rate_limited": 0}
+        self._lock = threading.Lock()
+
+    def add(self, queue_wait: float, latency: float, ok: bool) -> None:
+        with self._lock:
+            for name, value in (("queue_wait", queue_wait), ("latency", latency)):
+                values = self.samples[name]
+                values.append(value)
+                del values[:-self.window]
+            self.counters["calls"] += 1
+            if not ok:
+                self.counters["errors"] += 1
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = dict(self.counters)
+            for name, values in self.samples.items():
+                ordered = sorted(values)
+                for label, p in (("p50", 0.5), ("p99", 0.99)):
+                    value = ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+                    result[f"{name}_{label}_seconds"] = round(value, 3)
+        return result
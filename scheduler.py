@@ -0,0 +1,242 @@
+import itertools
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a per-process limit
+    fcntl = None
+
+# Host-wide slot counts per kind of heavy job, shared by every process on the
+# host through lock files.
+SLOTS = {
+    "install": int(os.getenv("RAVE_MAX_INSTALLS", "2")),
+    "build": int(os.getenv("RAVE_MAX_BUILDS", "2")),
+}
+# Memory a job of each kind is expected to need before it is admitted.
+MEMORY_MB = {
+    "install": int(os.getenv("RAVE_INSTALL_MEMORY_MB", "1024")),
+    "build": int(os.getenv("RAVE_BUILD_MEMORY_MB", "1536")),
+}
+LOCK_DIR = os.getenv("RAVE_SCHEDULER_DIR", os.path.join(tempfile.gettempdir(), "rave-scheduler"))
+POLL_SECONDS = 0.5
+
+_cond = threading.Condition()
+# One FIFO queue per kind so a waiting install never holds up a free build slot.
+_queues = {kind: deque() for kind in SLOTS}
+_sequence = itertools.count()
+_local_slots = {kind: set() for kind in SLOTS}
+_waits = []
+
+
+def _available_memory_mb():
+    """Return MemAvailable from /proc/meminfo, or None when it cannot be read."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def _slot_path(kind: str, index: int) -> str:
+    return os.path.join(LOCK_DIR, f"{kind}-{index}.lock")
+
+
+def _try_lock(path: str):
+    handle = open(path, "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return handle
+    except OSError:
+        handle.close()
+        return None
+
+
+def _try_acquire_slot(kind: str):
+    """Take a free slot of this kind; returns a release token or None."""
+    for index in range(SLOTS[kind]):
+        if index in _local_slots[kind]:
+            continue
+        if fcntl is None:
+            _local_slots[kind].add(index)
+            return (index, None)
+        handle = _try_lock(_slot_path(kind, index))
+        if handle is not None:
+            # The lock file records the job's memory reservation for the
+            # other processes on the host while the slot is held.
+            handle.seek(0)
+            handle.truncate()
+            handle.write(json.dumps({"pid": os.getpid(), "memory_mb": MEMORY_MB[kind]}))
+            handle.flush()
+            _local_slots[kind].add(index)
+            return (index, handle)
+    return None
+
+
+def _read_reservation(kind: str, index: int) -> int:
+    try:
+        with open(_slot_path(kind, index), "r") as f:
+            return int(json.load(f)["memory_mb"])
+    except (OSError, ValueError, KeyError, TypeError):
+        # Held but not written yet: assume the default for its kind.
+        return MEMORY_MB[kind]
+
+
+def _reserved_memory_mb(own: tuple = None) -> int:
+    """Sum the memory reserved by running jobs on the host, except the slot `own`.
+
+    Jobs that have just started have not used their memory yet, so
+    MemAvailable alone would let the next job in straight away.
+    """
+    total = 0
+    for kind, count in SLOTS.items():
+        for index in range(count):
+            if own == (kind, index):
+                continue
+            if index in _local_slots[kind]:
+                held = True
+            elif fcntl is None:
+                held = False
+            else:
+                handle = _try_lock(_slot_path(kind, index))
+                held = handle is None
+                if handle is not None:
+                    handle.close()
+            if held:
+                total += MEMORY_MB[kind] if fcntl is None else _read_reservation(kind, index)
+    return total
+
+
+def _host_idle() -> bool:
+    """Whether no heavy job holds a slot anywhere on the host."""
+    if any(_local_slots.values()):
+        return False
+    if fcntl is None:
+        return True
+    for kind, count in SLOTS.items():
+        for index in range(count):
+            handle = _try_lock(_slot_path(kind, index))
+            if handle is None:
+                return False
+            handle.close()
+    return True
+
+
+def _admit(kind: str, ticket: int):
+    """Try to admit the ticket at the head of the queue; returns a slot or None."""
+    queue = _queues[kind]
+    if not queue or queue[0] != ticket:
+        return None
+    slot = _try_acquire_slot(kind)
+    if slot is None:
+        return None
+    available = _available_memory_mb()
+    if available is not None:
+        available -= _reserved_memory_mb((kind, slot[0]))
+    if available is not None and available < MEMORY_MB[kind]:
+        # Low memory only blocks when something else can still free it up;
+        # on an idle host waiting would never help.
+        _release_slot(kind, slot)
+        if not _host_idle():
+            return None
+        slot = _try_acquire_slot(kind)
+        if slot is None:
+            return None
+    queue.popleft()
+    return slot
+
+
+def _release_slot(kind: str, slot: tuple) -> None:
+    index, handle = slot
+    if handle is not None:
+        handle.truncate(0)
+        handle.close()
+    _local_slots[kind].discard(index)
+
+
+@contextmanager
+def heavy_slot(kind: str):
+    """Hold a host-wide slot of `kind` for the duration of the block.
+
+    Waits in the per-kind FIFO queue until a slot is free and enough
+    memory is available. Yields the scheduling metrics, whose run time is
+    filled in when the block exits.
+    """
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    submitted = time.monotonic()
+    ticket = next(_sequence)
+    with _cond:
+        _queues[kind].append(ticket)
+        position = len(_queues[kind]) - 1
+        while True:
+            slot = _admit(kind, ticket)
+            if slot is not None:
+                break
+            _cond.wait(POLL_SECONDS)
+        # The next ticket may be able to run as well.
+        _cond.notify_all()
+
+    admitted = time.monotonic()
+    metrics = {
+        "kind": kind,
+        "queue_position": position,
+        "queue_wait_seconds": round(admitted - submitted, 3),
+        "run_seconds": None,
+        "slot": slot[0],
+        "available_memory_mb": _available_memory_mb(),
+    }
+    try:
+        yield metrics
+    finally:
+        with _cond:
+            _release_slot(kind, slot)
+            _waits.append(admitted - submitted)
+            del _waits[:-1000]
+            _cond.notify_all()
+        metrics["run_seconds"] = round(time.monotonic() - admitted, 3)
+
+
+def run_heavy(kind: str, command, cwd: str = ".", **kwargs):
+    """Run an install or build subprocess once the host has capacity for it.
+
+    Returns the CompletedProcess and the scheduling metrics for the tool
+    result; see heavy_slot().
+    """
+    with heavy_slot(kind) as metrics:
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True, **kwargs)
+    return result, metrics
+
+
+def get_scheduler_stats() -> dict:
+    """Report queue length and queue-wait percentiles for heavy subprocess jobs."""
+    with _cond:
+        waits = sorted(_waits)
+        queued = {kind: len(queue) for kind, queue in _queues.items()}
+        running = {kind: len(slots) for kind, slots in _local_slots.items()}
+        reserved = _reserved_memory_mb()
+
+    def percentile(p):
+        if not waits:
+            return 0.0
+        return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3)
+
+    return {
+        "status": "success",
+        "queued": queued,
+        "running": running,
+        "slots": dict(SLOTS),
+        "jobs": len(waits),
+        "queue_wait_p50_seconds": percentile(0.5),
+        "queue_wait_p99_seconds": percentile(0.99),
+        "available_memory_mb": _available_memory_mb(),
+        "reserved_memory_mb": reserved,
+    }
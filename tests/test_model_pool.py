@@ -0,0 +1,123 @@
+"""Run the model pool against a local mock of the Gemini REST endpoint."""
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RATE_LIMITED = json.dumps(
+    {"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}}
+).encode("utf-8")
+ANSWER = json.dumps(
+    {
+        "candidates": [
+            {"content": {"role": "model", "parts": [{"text": "ok"}]}, "finishReason": "STOP"}
+        ],
+        "usageMetadata": {"promptTokenCount": 3, "candidatesTokenCount": 1, "totalTokenCount": 4},
+    }
+).encode("utf-8")
+
+
+class MockGemini(BaseHTTPRequestHandler):
+    """Answers generateContent, failing with 429 the first `failures` times."""
+
+    failures = 0
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        MockGemini.requests.append({"path": self.path, "headers": dict(self.headers)})
+        if MockGemini.failures > 0:
+            MockGemini.failures -= 1
+            status, body = 429, RATE_LIMITED
+        else:
+            status, body = 200, ANSWER
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# The pool reads its settings at import time, and pytest may import the
+# package while collecting, so the endpoint is started and configured here.
+SERVER = ThreadingHTTPServer(("127.0.0.1", 0), MockGemini)
+threading.Thread(target=SERVER.serve_forever, daemon=True).start()
+os.environ.update(
+    {
+        "GOOGLE_API_KEY": "test-key",
+        "GOOGLE_GENAI_USE_VERTEXAI": "false",
+        "RAVE_MODEL_BASE_URL": f"http://127.0.0.1:{SERVER.server_port}",
+        "RAVE_MODEL_MAX_RETRIES": "3",
+    }
+)
+
+
+@pytest.fixture(scope="module")
+def model_pool():
+    sys.path.insert(0, os.path.dirname(REPO_DIR))
+    module = importlib.import_module(f"{os.path.basename(REPO_DIR)}.model_pool")
+    assert module.BASE_URL == os.environ["RAVE_MODEL_BASE_URL"]
+    yield module
+    SERVER.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def reset_mock():
+    MockGemini.failures = 0
+    MockGemini.requests = []
+
+
+def test_generate_content_retries_after_rate_limit(model_pool):
+    MockGemini.failures = 2
+    before = model_pool.get_model_pool_stats()
+
+    response = model_pool.generate_content("Say ok", priority="batch")
+
+    after = model_pool.get_model_pool_stats()
+    assert response.text == "ok"
+    assert len(MockGemini.requests) == 3
+    assert after["rate_limited"] - before["rate_limited"] == 2
+    assert after["retries"] - before["retries"] == 2
+
+
+def test_agent_model_retries_through_adk_client(model_pool):
+    MockGemini.failures = 1
+    request = LlmRequest(
+        model=model_pool.MODEL_NAME,
+        contents=[types.Content(role="user", parts=[types.Part(text="Say ok")])],
+    )
+
+    async def collect():
+        return [r async for r in model_pool.interactive_model.generate_content_async(request)]
+
+    responses = asyncio.run(collect())
+
+    assert responses[-1].content.parts[0].text == "ok"
+    assert len(MockGemini.requests) == 2
+    # ADK's own client is used, so its tracking headers reach the endpoint.
+    assert "google-adk" in MockGemini.requests[-1]["headers"].get("x-goog-api-client", "")
+
+
+def test_non_retryable_error_is_raised(model_pool):
+    MockGemini.failures = 1
+    original = model_pool.RETRY_CODES
+    model_pool.RETRY_CODES = set()
+    try:
+        with pytest.raises(model_pool.errors.APIError):
+            model_pool.generate_content("Say ok")
+    finally:
+        model_pool.RETRY_CODES = original
+    assert len(MockGemini.requests) == 1
@@ -2,6 +2,10 @@ import json
 import os
 
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
+
+from .checkpoint import record_checkpoint, session_id
+from .model_pool import batch_model
 
 
 def search_component_library(component_type: str, library: str = "shadcn") -> dict:
@@ -213,11 +217,17 @@ def create_component_structure(components_list: list) -> dict:
     }
 
 
-def save_ui_plan(ui_data: dict) -> dict:
+def save_ui_plan(ui_data: dict, tool_context: ToolContext = None) -> dict:
     """Save the UI component plan to a JSON file."""
     try:
         with open("ui_plan.json", "w") as f:
             json.dump(ui_data, f, indent=2)
+        record_checkpoint(
+            "ui_plan",
+            {"requirements": "requirements_data.json", "design": "design_data.json"},
+            {"ui_plan": "ui_plan.json"},
+            session_id(tool_context),
+        )
         return {
             "status": "success",
             "message": "UI plan saved to ui_plan.json"
@@ -228,7 +238,7 @@ def save_ui_plan(ui_data: dict) -> dict:
 
 ui_designer_agent = Agent(
     name="ui_designer",
-    model="gemini-2.0-flash",
+    model=batch_model,
     description="UI/UX specialist that helps design component structure and suggests React components from libraries.",
     instruction="""You are the UI Designer agent, an expert in modern web design and React component libraries.
 
@@ -0,0 +1,345 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: pins and the registry are only serialized within this process
+    fcntl = None
+
+# Quotas and sweep timing, overridable from the environment (see example.env).
+QUOTA_BYTES = int(float(os.getenv("RAVE_WORKSPACE_QUOTA_MB", "2048")) * 1024 * 1024)
+MAX_AGE_SECONDS = float(os.getenv("RAVE_WORKSPACE_MAX_AGE_HOURS", "72")) * 3600
+SWEEP_INTERVAL_SECONDS = float(os.getenv("RAVE_WORKSPACE_SWEEP_INTERVAL", "600"))
+# Anything touched this recently is never evicted, so a session that has just
+# created a project is safe even before it pins it.
+GRACE_SECONDS = 600
+# A pin lapses unless it is refreshed within this time, so sessions that never
+# reach pack do not protect their project forever.
+PIN_TTL_SECONDS = float(os.getenv("RAVE_WORKSPACE_PIN_TTL_HOURS", "6")) * 3600
+
+PINS_FILE = "workspace_pins.json"
+# Projects and zips the pipeline created. Nothing else in the working
+# directory is ever evicted, however old it is.
+REGISTRY_FILE = "workspace_artifacts.json"
+# Build caches count against the quota but are capped and evicted by their owners.
+CACHE_DIR = os.getenv("RAVE_CACHE_DIR", ".rave_cache")
+ZIP_PATTERN = re.compile(r".+_\d{8}_\d{6}\.zip$")
+# Directories inside a project that install/build can regenerate.
+REGENERABLE_DIRS = ("node_modules", "dist")
+
+_lock = threading.Lock()
+_sweeper = None
+_last_sweep = {}
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _is_astro_project(path: str) -> bool:
+    if not os.path.isfile(os.path.join(path, "package.json")):
+        return False
+    return any(name.startswith("astro.config.") for name in os.listdir(path))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _state_locked(root: str):
+    """Serialize pin, registry and eviction updates across threads and processes."""
+    with _lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(root, PINS_FILE + ".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _load_pins(root: str) -> dict:
+    """Return {path: {pid: expiry}} with dead and expired holders dropped."""
+    try:
+        with open(os.path.join(root, PINS_FILE), "r") as f:
+            pins = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    now = time.time()
+    live = {}
+    for path, holders in pins.items():
+        # Pins held by processes that have died or stopped refreshing them no
+        # longer protect anything.
+        holders = {
+            pid: expires for pid, expires in holders.items()
+            if expires > now and _pid_alive(int(pid))
+        }
+        if holders:
+            live[path] = holders
+    return live
+
+
+def _save_json(path: str, data: dict) -> None:
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _save_pins(root: str, pins: dict) -> None:
+    _save_json(os.path.join(root, PINS_FILE), pins)
+
+
+def _load_registry(root: str) -> dict:
+    """Return {path: created} for the artifacts the pipeline created."""
+    try:
+        with open(os.path.join(root, REGISTRY_FILE), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def register(path: str, root: str = ".") -> dict:
+    """Record a project directory or zip created by the pipeline so it may be evicted later."""
+    try:
+        path = os.path.abspath(path)
+        with _state_locked(root):
+            registry = _load_registry(root)
+            registry.setdefault(path, time.time())
+            _save_json(os.path.join(root, REGISTRY_FILE), registry)
+        return {"status": "success", "registered": path}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def is_registered(path: str, root: str = ".") -> bool:
+    return os.path.abspath(path) in _load_registry(root)
+
+
+def touch(path: str) -> None:
+    """Mark a workspace artifact as recently used."""
+    if os.path.exists(path):
+        os.utime(path, None)
+
+
+def pin(path: str, root: str = ".") -> dict:
+    """Protect a project directory or zip from eviction while a session uses it.
+
+    Pinning is idempotent per process: pinning again only refreshes the
+    pin's expiry, and a single unpin() releases it.
+    """
+    try:
+        path = os.path.abspath(path)
+        expires = time.time() + PIN_TTL_SECONDS
+        with _state_locked(root):
+            pins = _load_pins(root)
+            pins.setdefault(path, {})[str(os.getpid())] = expires
+            _save_pins(root, pins)
+        touch(path)
+        return {"status": "success", "pinned": path, "expires": expires}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def unpin(path: str, root: str = ".") -> dict:
+    """Release a pin taken with pin(); the artifact becomes evictable again."""
+    try:
+        path = os.path.abspath(path)
+        with _state_locked(root):
+            pins = _load_pins(root)
+            holders = pins.get(path, {})
+            if holders.pop(str(os.getpid()), None) is not None:
+                if not holders:
+                    pins.pop(path)
+                _save_pins(root, pins)
+        touch(path)
+        return {"status": "success", "unpinned": path}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def scan_workspace(root: str = ".") -> list:
+    """List the pipeline's artifacts in the workspace with size and last use time."""
+    root = os.path.abspath(root)
+    cache_dir = os.path.abspath(CACHE_DIR)
+    registry = _load_registry(root)
+    artifacts = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if path == cache_dir and os.path.isdir(path):
+            artifacts.append(
+                {"kind": "cache", "path": path, "size": _dir_size(path), "last_used": time.time()}
+            )
+        elif path not in registry:
+            continue
+        elif os.path.isfile(path) and ZIP_PATTERN.match(name):
+            stat = os.stat(path)
+            artifacts.append(
+                {"kind": "zip", "path": path, "size": stat.st_size, "last_used": stat.st_mtime}
+            )
+        elif os.path.isdir(path) and _is_astro_project(path):
+            parts = {
+                sub: _dir_size(os.path.join(path, sub))
+                for sub in REGENERABLE_DIRS
+                if os.path.isdir(os.path.join(path, sub))
+            }
+            artifacts.append(
+                {
+                    "kind": "project",
+                    "path": path,
+                    "size": _dir_size(path),
+                    "regenerable": parts,
+                    "last_used": os.stat(path).st_mtime,
+                }
+            )
+    return artifacts
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def sweep(root: str = ".", quota_bytes: int = None, max_age_seconds: float = None) -> dict:
+    """Evict old and least recently used artifacts until the workspace fits its quota.
+
+    Only registered artifacts are considered; pinned ones and anything used
+    within the grace window are never touched. Artifacts idle longer than
+    max_age_seconds are removed first.
+    If the workspace is still over quota, the dist/ and node_modules/ folders
+    of the least recently used projects are dropped (install and build can
+    recreate them), and only then whole projects and zips, oldest first.
+    """
+    quota_bytes = QUOTA_BYTES if quota_bytes is None else quota_bytes
+    max_age_seconds = MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+    try:
+        # Walking node_modules is slow, so sizes are measured without holding
+        # the lock; pins and last use are re-read under it before deleting.
+        artifacts = scan_workspace(root)
+        with _state_locked(root):
+            now = time.time()
+            pins = _load_pins(root)
+            total = sum(a["size"] for a in artifacts)
+            evicted = []
+
+            for a in artifacts:
+                if os.path.exists(a["path"]):
+                    a["last_used"] = os.stat(a["path"]).st_mtime
+            candidates = sorted(
+                (
+                    a for a in artifacts
+                    if a["kind"] != "cache"
+                    and a["path"] not in pins
+                    and os.path.exists(a["path"])
+                    and now - a["last_used"] > GRACE_SECONDS
+                ),
+                key=lambda a: a["last_used"],
+            )
+
+            def evict(path, size, reason):
+                nonlocal total
+                _remove(path)
+                total -= size
+                evicted.append({"path": path, "size": size, "reason": reason})
+
+            for a in list(candidates):
+                if now - a["last_used"] > max_age_seconds:
+                    evict(a["path"], a["size"], "age")
+                    candidates.remove(a)
+
+            for a in candidates:
+                if total <= quota_bytes:
+                    break
+                for sub, size in a.get("regenerable", {}).items():
+                    evict(os.path.join(a["path"], sub), size, "quota")
+                    a["size"] -= size
+                a["regenerable"] = {}
+
+            for a in candidates:
+                if total <= quota_bytes:
+                    break
+                evict(a["path"], a["size"], "quota")
+
+            registry = _load_registry(root)
+            for path in [p for p in registry if not os.path.exists(p)]:
+                registry.pop(path)
+            _save_json(os.path.join(root, REGISTRY_FILE), registry)
+
+            _last_sweep.clear()
+            _last_sweep.update(
+                {
+                    "timestamp": now,
+                    "evicted": len(evicted),
+                    "freed_bytes": sum(e["size"] for e in evicted),
+                }
+            )
+        return {
+            "status": "success",
+            "evicted": evicted,
+            "total_bytes": total,
+            "quota_bytes": quota_bytes,
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def get_workspace_usage(root: str = ".") -> dict:
+    """Report disk usage of project directories and zips, pins and the last sweep."""
+    try:
+        artifacts = scan_workspace(root)
+        by_kind = {}
+        for a in artifacts:
+            by_kind[a["kind"]] = by_kind.get(a["kind"], 0) + a["size"]
+        regenerable = sum(sum(a.get("regenerable", {}).values()) for a in artifacts)
+        return {
+            "status": "success",
+            "total_bytes": sum(by_kind.values()),
+            "quota_bytes": QUOTA_BYTES,
+            "bytes_by_kind": by_kind,
+            "regenerable_bytes": regenerable,
+            "artifact_count": len(artifacts),
+            "pinned": sorted(_load_pins(root)),
+            "registered": len(_load_registry(root)),
+            "last_sweep": dict(_last_sweep),
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+def start_sweeper(root: str = ".", interval: float = None) -> None:
+    """Start the background sweeper thread once per process."""
+    global _sweeper
+    interval = SWEEP_INTERVAL_SECONDS if interval is None else interval
+    if interval <= 0 or (_sweeper is not None and _sweeper.is_alive()):
+        return
+    root = os.path.abspath(root)
+
+    def run():
+        while True:
+            sweep(root)
+            time.sleep(interval)
+
+    _sweeper = threading.Thread(target=run, name="rave-workspace-sweeper", daemon=True)
+    _sweeper.start()